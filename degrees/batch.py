@@ -0,0 +1,133 @@
+import csv
+import sys
+
+from names import NameIndex
+from snapshot import load_graph
+
+# Candidates listed when a name is ambiguous or not found
+CANDIDATES = 5
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python batch.py directory [pairs.csv]")
+    directory = sys.argv[1]
+
+    graph = load_graph(directory)
+    names = NameIndex.from_graph(graph)
+
+    if len(sys.argv) == 3 and sys.argv[2] != "-":
+        with open(sys.argv[2], encoding="utf-8", newline="") as f:
+            pairs = read_pairs(f)
+    else:
+        pairs = read_pairs(sys.stdin)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["source", "target", "degrees", "path"])
+    for row in answer_pairs(graph, names, pairs):
+        writer.writerow(row)
+        sys.stdout.flush()
+
+
+def read_pairs(f):
+    """
+    Reads (source, target) pairs from a CSV file, one pair per row.
+    Each entry is a person's name or IMDB id. Blank rows are skipped.
+    """
+    return [
+        (row[0].strip(), row[1].strip())
+        for row in csv.reader(f)
+        if len(row) >= 2
+    ]
+
+
+def answer_pairs(graph, names, pairs):
+    """
+    Yields a (source, target, degrees, path) row for each pair,
+    running a single search per distinct source. Names are resolved
+    with `names`, a NameIndex of the graph.
+
+    Rows for the same source are yielded together as soon as
+    that source's search finishes.
+    """
+    # Group pairs by source, keeping the order sources first appear in
+    groups = {}
+    for source, target in pairs:
+        groups.setdefault(source, []).append(target)
+
+    for source, targets in groups.items():
+        source_index, error, candidates = resolve(graph, names, source)
+        if error is not None:
+            for target in targets:
+                yield source, target, explain(error, candidates), ""
+            continue
+
+        resolved = {target: resolve(graph, names, target)
+                    for target in targets}
+        indices = [index for index, error, _ in resolved.values()
+                   if error is None]
+
+        # A lone target is cheaper to reach with a bidirectional search
+        if len(indices) == 1:
+            paths = {indices[0]: graph.search(source_index, indices[0])}
+        else:
+            parents = graph.search_many(source_index, indices)
+            paths = {index: graph.path_to(parents, index)
+                     for index in indices}
+
+        for target in targets:
+            target_index, error, candidates = resolved[target]
+            if error is not None:
+                yield source, target, explain(error, candidates), ""
+                continue
+            path = paths[target_index]
+            if path is None:
+                yield source, target, "not connected", ""
+            else:
+                yield (source, target, len(path),
+                       describe(graph, source_index, path))
+
+
+def resolve(graph, names, name):
+    """
+    Returns (index, error, candidates) for a name or IMDB id without
+    prompting, using `names`, a NameIndex of the graph. A name matching
+    one person exactly, or else within one typo, resolves to them.
+
+    Otherwise index is None, error is "ambiguous name" or "person not
+    found", and candidates are the closest matches from `lookup`.
+    """
+    index = graph.person_index(name)
+    if index is not None:
+        return index, None, []
+    person_id = names.resolve(name)
+    if person_id is not None:
+        return graph.person_index(person_id), None, []
+    error = "ambiguous name" if names.exact(name) else "person not found"
+    return None, error, names.lookup(name, CANDIDATES)
+
+
+def explain(error, candidates):
+    """
+    Returns an error with its candidates as "error: name (id, birth); ...".
+    """
+    if not candidates:
+        return error
+    return f"{error}: " + "; ".join(
+        f"{c.name} ({c.person_id}, {c.birth or '?'})" for c in candidates
+    )
+
+
+def describe(graph, source, path):
+    """
+    Returns a path as "person; movie; person; ..." using names and titles.
+    """
+    parts = [graph.person_names[source]]
+    for movie, person in path:
+        parts.append(graph.movie_titles[movie])
+        parts.append(graph.person_names[person])
+    return "; ".join(parts)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 import csv
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import bidirectional_search, shortest_paths
+from snapshot import load_graph
+from util import Node, IndexedQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -53,34 +55,43 @@ def load_data(directory):
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [paths]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else None
 
-    # Load data from files into memory
+    # Load data from the snapshot, or from files on first run
     print("Loading data...")
-    load_data(directory)
+    graph = load_graph(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_for_name(graph, input("Name: "))
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_for_name(graph, input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    # With a count, show that many of the shortest paths, most recent first
+    if count is None:
+        path = graph.search(source, target)
+        paths = [] if path is None else [path]
+    else:
+        paths = graph.top_paths(source, target, count)
 
-    if path is None:
+    if not paths:
         print("Not connected.")
-    else:
+    for n, path in enumerate(paths):
         degrees = len(path)
-        print(f"{degrees} degrees of separation.")
+        if n == 0:
+            print(f"{degrees} degrees of separation.")
+        if count is not None:
+            print(f"Path {n + 1}:")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
@@ -94,10 +105,10 @@ def shortest_path(source, target):
 
     # TODO
     start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
+    frontier = IndexedQueueFrontier()
     frontier.add(start)
 
-    explored = []
+    explored = set()
     
     found = False
 
@@ -119,12 +130,44 @@ def shortest_path(source, target):
             found = True
             return list(zip(actions, cells))
         else:
-            explored.append(node.state)
+            explored.add(node.state)
             for action, state in neighbors_for_person(node.state):
                 if not frontier.contains_state(state) and state not in explored:
                     frontier.add(Node(state=state, parent=node, action=action))
 
 
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching breadth-first
+    from both ends at once and always expanding the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    return bidirectional_search(source, target, casts_for_person)
+
+
+def casts_for_person(person_id):
+    """
+    Returns (movie_id, person_ids) pairs with the stars of each movie
+    a given person starred in.
+    """
+    return [
+        (movie_id, movies[movie_id]["stars"])
+        for movie_id in people[person_id]["movies"]
+    ]
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs
+    that connects the source to the target, one at a time.
+
+    Yields nothing if there is no possible path.
+    """
+    return shortest_paths(source, target, casts_for_person)
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -151,6 +194,32 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_for_name(graph, name):
+    """
+    Returns the compact graph index for a person's name,
+    resolving ambiguities as needed.
+    """
+    indices = graph.people_named(name)
+    if len(indices) == 0:
+        return None
+    elif len(indices) > 1:
+        print(f"Which '{name}'?")
+        for index in indices:
+            person_id = graph.person_ids[index]
+            name = graph.person_names[index]
+            birth = graph.person_births[index]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        try:
+            index = graph.person_index(input("Intended Person ID: "))
+            if index in indices:
+                return index
+        except ValueError:
+            pass
+        return None
+    else:
+        return indices[0]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,415 @@
+import csv
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class CompactGraph():
+    """
+    Compact, integer-indexed form of the people/movies data.
+
+    People and movies are interned to dense ints. People are numbered
+    in order of lowercase name, so name lookups are a binary search,
+    and movies in order of id. Person -> movie and movie -> person
+    adjacency is stored as CSR arrays: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and
+    likewise for the stars of a movie.
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies,
+                 movie_offsets, movie_people, person_order):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Person indices sorted by person_id, for id lookups
+        self.person_order = person_order
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Load a compact graph straight from the CSV files in `directory`,
+        without building the `people` and `movies` dictionaries.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            people = [
+                (row["id"], row["name"], row["birth"])
+                for row in csv.DictReader(f)
+            ]
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            movies = [
+                (row["id"], row["title"], row["year"])
+                for row in csv.DictReader(f)
+            ]
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            stars = [
+                (row["person_id"], row["movie_id"])
+                for row in csv.DictReader(f)
+            ]
+        return cls.build(people, movies, stars)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Build a compact graph from the `people` and `movies`
+        dictionaries filled in by `degrees.load_data`.
+        """
+        return cls.build(
+            [(person_id, person["name"], person["birth"])
+             for person_id, person in people.items()],
+            [(movie_id, movie["title"], movie["year"])
+             for movie_id, movie in movies.items()],
+            [(person_id, movie_id)
+             for movie_id, movie in movies.items()
+             for person_id in movie["stars"]]
+        )
+
+    @classmethod
+    def build(cls, people, movies, stars):
+        """
+        Build a compact graph from (id, name, birth) people rows,
+        (id, title, year) movie rows and (person_id, movie_id) stars.
+        Stars referring to unknown people or movies are skipped.
+        """
+        people = sorted(people, key=lambda row: (row[1].lower(), row[0]))
+        movies = sorted(movies, key=lambda row: row[0])
+        person_index = {row[0]: i for i, row in enumerate(people)}
+        movie_index = {row[0]: i for i, row in enumerate(movies)}
+
+        # Intern each (person, movie) edge once
+        edges = set()
+        for person_id, movie_id in stars:
+            try:
+                edges.add((person_index[person_id], movie_index[movie_id]))
+            except KeyError:
+                pass
+        edges = sorted(edges)
+
+        person_offsets, person_movies = csr(len(people), edges)
+        movie_offsets, movie_people = csr(
+            len(movies), sorted((m, p) for p, m in edges)
+        )
+        person_order = array("i", sorted(
+            range(len(people)), key=lambda i: people[i][0]
+        ))
+
+        return cls(
+            [row[0] for row in people],
+            [row[1] for row in people],
+            [row[2] for row in people],
+            [row[0] for row in movies],
+            [row[1] for row in movies],
+            [row[2] for row in movies],
+            person_offsets, person_movies,
+            movie_offsets, movie_people, person_order
+        )
+
+    def person_count(self):
+        return len(self.person_offsets) - 1
+
+    def movie_count(self):
+        return len(self.movie_offsets) - 1
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index for an IMDB person id, or None.
+        """
+        ids = self.person_ids
+        i = bisect_left(self.person_order, person_id, key=lambda p: ids[p])
+        order = self.person_order
+        if i < len(order) and ids[order[i]] == person_id:
+            return order[i]
+        return None
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index for an IMDB movie id, or None.
+        """
+        i = bisect_left(self.movie_ids, movie_id)
+        if i < len(self.movie_ids) and self.movie_ids[i] == movie_id:
+            return i
+        return None
+
+    def people_named(self, name):
+        """
+        Returns the dense indices of every person with the given name,
+        ignoring case.
+        """
+        name = name.lower()
+        key = str.lower
+        lo = bisect_left(self.person_names, name, key=key)
+        hi = bisect_right(self.person_names, name, lo=lo, key=key)
+        return range(lo, hi)
+
+    def movies_for_person(self, person):
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_for_movie(self, movie):
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person.
+        """
+        for movie, costars in self.casts(person):
+            for costar in costars:
+                yield movie, costar
+
+    def casts(self, person):
+        """
+        Returns (movie, people) pairs with the stars of each movie
+        a given person starred in.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        return [
+            (movie, movie_people[movie_offsets[movie]:movie_offsets[movie + 1]])
+            for movie in self.movies_for_person(person)
+        ]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, given IMDB ids.
+
+        If no possible path, returns None.
+        """
+        path = self.search(self.person_index(source),
+                           self.person_index(target))
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+    def search(self, source, target):
+        """
+        Bidirectional breadth-first search between two dense person
+        indices. Returns a list of (movie, person) index pairs, or None.
+        """
+        if source is None or target is None:
+            return None
+        return bidirectional_search(source, target, self.casts)
+
+    def top_paths(self, source, target, k, key=None):
+        """
+        Returns up to `k` of the shortest paths between two dense person
+        indices, as lists of (movie, person) index pairs, ranked highest
+        first by `key`, a function of a path. By default, paths through
+        more recent movies rank higher.
+        """
+        if key is None:
+            key = self.path_recency
+        return heapq.nlargest(k, shortest_paths(source, target, self.casts),
+                              key=key)
+
+    def path_recency(self, path):
+        """
+        Returns the sum of the release years of the movies in a path,
+        counting movies with no known year as 0.
+        """
+        return sum(int(self.movie_years[movie] or 0) for movie, _ in path)
+
+    def search_many(self, source, targets):
+        """
+        Breadth-first search from `source` that stops once every person
+        in `targets` has been reached. Returns the parent map, from which
+        `path_to` rebuilds the path to any reached person.
+        """
+        parents = {source: None}
+        remaining = set(targets) - {source}
+        frontier = [source]
+        while frontier and remaining:
+            frontier, _ = expand_layer(frontier, parents, (), self.casts)
+            remaining.difference_update(frontier)
+        return parents
+
+    def path_to(self, parents, target):
+        """
+        Returns the list of (movie, person) index pairs leading to
+        `target` in a parent map, or None if it was not reached.
+        """
+        if target not in parents:
+            return None
+        path = []
+        while parents[target] is not None:
+            movie, parent = parents[target]
+            path.append((movie, target))
+            target = parent
+        path.reverse()
+        return path
+
+
+def bidirectional_search(source, target, casts):
+    """
+    Returns the shortest list of (movie, person) pairs that connect
+    the source to the target, searching breadth-first from both ends
+    at once and always expanding the smaller frontier. `casts` maps a
+    person to (movie, people) pairs with the stars of each of their
+    movies.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie, person) step that reached
+    # them, pointing back towards the side's origin
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward, casts
+            )
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward, casts
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, parents, other_parents, casts):
+    """
+    Expands every person in `frontier` by one step, recording parents.
+
+    Returns the next layer and the first person already reached
+    from the other side, or None if the two searches have not met.
+    """
+    layer = []
+    meeting = None
+    for person in frontier:
+        for movie, costars in casts(person):
+            for costar in costars:
+                if costar in parents:
+                    continue
+                parents[costar] = (movie, person)
+                layer.append(costar)
+                if meeting is None and costar in other_parents:
+                    meeting = costar
+    return layer, meeting
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Stitches the forward and backward parent chains through `meeting`
+    into a single list of (movie, person) pairs.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, child = backward[person]
+        path.append((movie, child))
+        person = child
+    return path
+
+
+def shortest_paths(source, target, casts):
+    """
+    Yields every shortest list of (movie, person) pairs that connects
+    the source to the target, one at a time, with `casts` as for
+    `bidirectional_search`.
+
+    Yields nothing if there is no possible path.
+    """
+    predecessors = shortest_path_dag(source, target, casts)
+    if predecessors is None:
+        return
+
+    # Walk the predecessor DAG back from the target depth-first,
+    # keeping only the current partial path in memory
+    path = []
+    stack = [(target, iter(predecessors[target]))]
+    while stack:
+        person, options = stack[-1]
+        if person == source:
+            yield path[::-1]
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        step = next(options, None)
+        if step is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        movie, parent = step
+        path.append((movie, person))
+        stack.append((parent, iter(predecessors[parent])))
+
+
+def shortest_path_dag(source, target, casts):
+    """
+    Runs a layered breadth-first search from source to target and returns
+    a dict mapping each person on some shortest path to the list of
+    (movie, person) steps that reach them from the previous layer.
+
+    If no possible path, returns None.
+    """
+    predecessors = {source: []}
+    layer = {source}
+    while layer and target not in layer:
+        next_layer = {}
+        for person in layer:
+            for movie, costars in casts(person):
+                for costar in costars:
+                    if costar in predecessors:
+                        continue
+                    next_layer.setdefault(costar, []).append((movie, person))
+        predecessors.update(next_layer)
+        layer = set(next_layer)
+    if target not in predecessors:
+        return None
+
+    # Keep only the people the target can be reached back through
+    dag = {}
+    pending = [target]
+    while pending:
+        person = pending.pop()
+        if person in dag:
+            continue
+        dag[person] = predecessors[person]
+        pending.extend(parent for _, parent in dag[person])
+    return dag
+
+
+def csr(rows, pairs):
+    """
+    Returns (offsets, indices) CSR arrays for `rows` rows
+    from (row, column) pairs sorted by row.
+    """
+    offsets = array("q", bytes(8 * (rows + 1)))
+    indices = array("i", bytes(4 * len(pairs)))
+    for i, (row, column) in enumerate(pairs):
+        offsets[row + 1] += 1
+        indices[i] = column
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+    return offsets, indices
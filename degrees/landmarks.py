@@ -0,0 +1,204 @@
+import json
+import os
+import struct
+import sys
+from array import array
+
+import degrees
+from snapshot import source_stats
+
+MAGIC = b"DEGLMK2\n"
+INDEX = "landmarks.index"
+LANDMARKS = 16
+
+# Distances are stored in one byte each; this value means unreachable
+UNREACHABLE = 255
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else LANDMARKS
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    index = LandmarkIndex.build(degrees.people, degrees.movies, count)
+    path = os.path.join(directory, INDEX)
+    index.save(path, source_stats(directory))
+    print(f"Wrote {len(index.landmarks)} landmarks to {path}.")
+
+
+class LandmarkIndex():
+    """
+    Breadth-first distances from a few landmark people to everyone else,
+    used to bound the degrees of separation between any two people
+    without searching.
+
+    `search`, if given, finds the shortest path between two person ids,
+    as `CompactGraph.shortest_path` does, for when the bounds disagree.
+    """
+
+    def __init__(self, person_ids, landmarks, distances, search=None):
+        self.person_ids = person_ids
+        self.position = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.landmarks = landmarks
+        self.distances = distances
+        self.search = search
+
+    @classmethod
+    def build(cls, people, movies, count=LANDMARKS, search=None):
+        """
+        Build an index from the `people` and `movies` dictionaries
+        filled in by `degrees.load_data`, with up to `count` landmarks.
+
+        Landmarks are the best-connected people, skipping anyone who
+        co-starred with a landmark already chosen.
+        """
+        person_ids = sorted(people)
+        position = {person_id: i for i, person_id in enumerate(person_ids)}
+
+        def connections(person_id):
+            return sum(
+                len(movies[movie_id]["stars"])
+                for movie_id in people[person_id]["movies"]
+            )
+
+        landmarks = []
+        distances = []
+        for person_id in sorted(people, key=connections, reverse=True):
+            if len(landmarks) == count:
+                break
+            if any(d[position[person_id]] <= 1 for d in distances):
+                continue
+            landmarks.append(person_id)
+            distances.append(distances_from(person_id, people, movies,
+                                            position))
+        return cls(person_ids, landmarks, distances, search)
+
+    @classmethod
+    def load(cls, path, search=None, sources=None):
+        """
+        Load an index written by `save`.
+
+        Raises ValueError if the file is not a landmark index, or if
+        `sources` is given and does not match the stats it was saved with.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("not a landmark index")
+            (length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(length))
+            if sources is not None and header.get("sources") != sources:
+                raise ValueError("landmark index is older than the data")
+            person_ids = f.read(header["ids"]).decode("utf-8").split("\n")
+            distances = []
+            for _ in header["landmarks"]:
+                d = array("B")
+                d.fromfile(f, header["people"])
+                distances.append(d)
+        if not header["ids"]:
+            person_ids = []
+        return cls(person_ids, header["landmarks"], distances, search)
+
+    def save(self, path, sources=None):
+        """
+        Write the index to `path`: the magic bytes, a length-prefixed
+        JSON header, the person ids and one byte array per landmark.
+        `sources` are the stats of the CSV files, as from `source_stats`.
+        """
+        ids = "\n".join(self.person_ids).encode("utf-8")
+        header = json.dumps({
+            "sources": sources,
+            "landmarks": self.landmarks,
+            "people": len(self.person_ids),
+            "ids": len(ids)
+        }).encode()
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(ids)
+            for d in self.distances:
+                d.tofile(f)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation
+        between two person ids. Upper is None when no landmark connects
+        them, and both are None when they are known not to be connected.
+        """
+        if source == target:
+            return 0, 0
+        i = self.position.get(source)
+        j = self.position.get(target)
+        lower, upper = 1, None
+        if i is None or j is None:
+            return lower, upper
+
+        for d in self.distances:
+            a, b = d[i], d[j]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            if a == UNREACHABLE or b == UNREACHABLE:
+                # One of them shares the landmark's component, the other not
+                return None, None
+            lower = max(lower, abs(a - b))
+            upper = a + b if upper is None else min(upper, a + b)
+        return lower, upper
+
+    def degrees(self, source, target):
+        """
+        Returns the degrees of separation between two person ids,
+        or None if they are not connected or not in the index.
+
+        Answers from the landmark bounds when they agree, and falls back
+        to `search` when they do not, raising ValueError without one.
+        """
+        if source not in self.position or target not in self.position:
+            return None
+        lower, upper = self.bounds(source, target)
+        if lower == upper:
+            return lower
+        if self.search is None:
+            raise ValueError("landmark bounds disagree and there is no search")
+        path = self.search(source, target)
+        return None if path is None else len(path)
+
+
+def load_index(directory, search):
+    """
+    Load the landmark index for `directory`, checking that it was built
+    from the CSV files as they are now, with `search` to fall back on.
+    """
+    return LandmarkIndex.load(os.path.join(directory, INDEX), search,
+                              source_stats(directory))
+
+
+def distances_from(source, people, movies, position):
+    """
+    Returns a byte array of breadth-first distances from `source`
+    to every person, indexed by `position`.
+    """
+    distances = array("B", [UNREACHABLE]) * len(position)
+    distances[position[source]] = 0
+    layer = [source]
+    depth = 0
+    while layer and depth < UNREACHABLE - 1:
+        depth += 1
+        next_layer = []
+        for person_id in layer:
+            for movie_id in people[person_id]["movies"]:
+                for neighbor_id in movies[movie_id]["stars"]:
+                    i = position[neighbor_id]
+                    if distances[i] == UNREACHABLE:
+                        distances[i] = depth
+                        next_layer.append(neighbor_id)
+        layer = next_layer
+    return distances
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+# A ranked lookup result; distance is the edit distance to the query,
+# and 0 for exact and prefix matches
+Candidate = namedtuple("Candidate", ["person_id", "name", "birth", "distance"])
+
+# Number of shared rare trigrams a fuzzy candidate must have
+FILTER = 3
+
+
+class NameIndex():
+    """
+    Index of people's names supporting exact, prefix and typo-tolerant
+    lookups without prompting.
+
+    Names are compared lowercased with runs of whitespace collapsed.
+    Fuzzy lookups gather candidates sharing trigrams with the query
+    and rank them by edit distance.
+    """
+
+    def __init__(self, people):
+        """
+        Build the index from (person_id, name, birth) tuples.
+        """
+        self.people = {}
+        for person_id, name, birth in people:
+            key = normalize(name)
+            self.people.setdefault(key, []).append((person_id, name, birth))
+
+        # Distinct keys in sorted order, for prefix search
+        self.keys = sorted(self.people)
+
+        # Maps each trigram to the positions in `keys` of names containing
+        # it, shortest names first, so a length window is a slice
+        self.trigrams = {}
+        for i in sorted(range(len(self.keys)), key=lambda i: len(self.keys[i])):
+            for gram in trigrams(self.keys[i]):
+                self.trigrams.setdefault(gram, []).append(i)
+
+    @classmethod
+    def from_people(cls, people):
+        """
+        Build the index from the `people` dictionary
+        filled in by `degrees.load_data`.
+        """
+        return cls(
+            (person_id, person["name"], person["birth"])
+            for person_id, person in people.items()
+        )
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build the index from a CompactGraph.
+        """
+        return cls(zip(graph.person_ids, graph.person_names,
+                       graph.person_births))
+
+    def exact(self, name):
+        """
+        Returns candidates whose name is exactly `name`, ignoring case.
+        """
+        return [
+            Candidate(person_id, name, birth, 0)
+            for person_id, name, birth in self.people.get(normalize(name), [])
+        ]
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` candidates whose name starts with `prefix`,
+        in alphabetical order.
+        """
+        prefix = normalize(prefix)
+        results = []
+        i = bisect_left(self.keys, prefix)
+        while (i < len(self.keys) and len(results) < limit
+               and self.keys[i].startswith(prefix)):
+            for person_id, name, birth in self.people[self.keys[i]]:
+                results.append(Candidate(person_id, name, birth, 0))
+            i += 1
+        return results[:limit]
+
+    def fuzzy(self, name, limit=10, max_distance=2):
+        """
+        Returns up to `limit` candidates within `max_distance` edits
+        of `name`, closest first.
+        """
+        query = normalize(name)
+        grams = trigrams(query)
+
+        # Only names within max_distance of the query's length can match;
+        # each posting is sorted by name length, so find that window
+        keys = self.keys
+        shortest = len(query) - max_distance
+        longest = len(query) + max_distance
+        windows = []
+        for gram in grams:
+            posting = self.trigrams.get(gram, ())
+            lo = bisect_left(posting, shortest, key=lambda i: len(keys[i]))
+            hi = bisect_right(posting, longest, lo=lo,
+                              key=lambda i: len(keys[i]))
+            windows.append(posting[lo:hi])
+        windows.sort(key=len)
+
+        # A name within k edits of the query shares all but at most 3k
+        # of the query's trigrams, so among the query's 3k + t rarest
+        # trigrams it must contain at least t
+        scanned = min(len(windows), 3 * max_distance + FILTER)
+        needed = max(1, scanned - 3 * max_distance)
+        hits = {}
+        for window in windows[:scanned]:
+            for i in window:
+                hits[i] = hits.get(i, 0) + 1
+        candidates = [i for i, count in hits.items() if count >= needed]
+
+        scored = []
+        for i in candidates:
+            key = keys[i]
+            distance = edit_distance(query, key, max_distance)
+            if distance is not None:
+                scored.append((distance, key))
+        scored.sort()
+
+        results = []
+        for distance, key in scored:
+            for person_id, name, birth in self.people[key]:
+                results.append(Candidate(person_id, name, birth, distance))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def lookup(self, name, limit=10, max_distance=2):
+        """
+        Returns up to `limit` ranked candidates for `name`: exact matches,
+        then prefix matches, then fuzzy matches, without duplicates.
+        """
+        results = []
+        seen = set()
+        for candidates in (
+            lambda: self.exact(name),
+            lambda: self.prefix(name, limit),
+            lambda: self.fuzzy(name, limit, max_distance)
+        ):
+            for candidate in candidates():
+                if candidate.person_id not in seen:
+                    seen.add(candidate.person_id)
+                    results.append(candidate)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def resolve(self, name):
+        """
+        Returns the person_id for `name` if exactly one person matches it
+        (exactly, or else as the single closest fuzzy match), or None.
+        """
+        candidates = self.exact(name)
+        if not candidates:
+            candidates = self.fuzzy(name, limit=2, max_distance=1)
+        if len(candidates) == 1:
+            return candidates[0].person_id
+        return None
+
+
+def normalize(name):
+    return " ".join(name.lower().split())
+
+
+def trigrams(key):
+    """
+    Returns the set of trigrams of a key, padded so that
+    short names and word boundaries also produce trigrams.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between `a` and `b`,
+    or None if it exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
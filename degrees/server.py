@@ -0,0 +1,139 @@
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from batch import resolve
+from names import NameIndex
+from snapshot import SNAPSHOT, load_graph, read_snapshot, source_stats
+
+# Graph loaded once per worker process; the snapshot is memory-mapped,
+# so every worker shares the same pages of the operating system cache
+graph = None
+
+# NameIndex of the graph, built once per worker process
+names = None
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python server.py directory [workers]")
+    directory = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else os.cpu_count()
+
+    # Make sure a snapshot exists before the workers map it
+    load_graph(directory)
+    try:
+        read_snapshot(os.path.join(directory, SNAPSHOT),
+                      source_stats(directory))
+    except (OSError, ValueError) as e:
+        print(f"Warning: no snapshot to share ({e}); each worker will "
+              "parse the CSV files into its own copy of the graph.",
+              file=sys.stderr)
+
+    # Each request is dispatched as soon as its line is read, and
+    # answered from the pool's result thread as soon as it is done
+    with multiprocessing.Pool(workers, initializer=init_worker,
+                              initargs=(directory,)) as pool:
+        for line in sys.stdin:
+            if line.strip():
+                received = time.perf_counter()
+                pool.apply_async(
+                    answer, (line,),
+                    callback=functools.partial(respond, received),
+                    error_callback=functools.partial(fail, received, line)
+                )
+        pool.close()
+        pool.join()
+
+
+def init_worker(directory):
+    global graph, names
+    graph = load_graph(directory)
+    names = NameIndex.from_graph(graph)
+
+
+def respond(received, response):
+    """
+    Writes a response as one JSON line, with the time since its request
+    was read, including any wait for a free worker, in "latency_ms".
+    """
+    response["latency_ms"] = round((time.perf_counter() - received) * 1000, 3)
+    print(json.dumps(response), flush=True)
+
+
+def fail(received, line, error):
+    """
+    Responds to a request whose worker raised an unexpected exception.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError:
+        request = None
+    respond(received, {
+        "id": request.get("id") if isinstance(request, dict) else None,
+        "error": f"internal error: {type(error).__name__}"
+    })
+
+
+def answer(line):
+    """
+    Answers one JSON request line of the form
+    {"id": ..., "source": name, "target": name}
+    and returns the response as a dictionary.
+
+    The response echoes "id" and holds either "degrees" and "path"
+    (a list of {"movie", "person"} steps), or "error". Names that are
+    ambiguous or not found also get "candidates", a list of
+    {"id", "name", "birth"} closest matches.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return {"id": None, "error": "malformed request"}
+    if not isinstance(request, dict):
+        return {"id": None, "error": "malformed request"}
+
+    response = {"id": request.get("id")}
+    try:
+        response.update(query(request["source"], request["target"]))
+    except (KeyError, TypeError, AttributeError):
+        response["error"] = "malformed request"
+    return response
+
+
+def query(source, target):
+    source_index, error, candidates = resolve(graph, names, source)
+    if error is not None:
+        return failure(f"source: {error}", candidates)
+    target_index, error, candidates = resolve(graph, names, target)
+    if error is not None:
+        return failure(f"target: {error}", candidates)
+
+    path = graph.search(source_index, target_index)
+    if path is None:
+        return {"degrees": None, "path": None}
+    return {
+        "degrees": len(path),
+        "path": [
+            {"movie": graph.movie_titles[movie],
+             "person": graph.person_names[person]}
+            for movie, person in path
+        ]
+    }
+
+
+def failure(error, candidates):
+    return {
+        "error": error,
+        "candidates": [
+            {"id": c.person_id, "name": c.name, "birth": c.birth}
+            for c in candidates
+        ]
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from graph import CompactGraph
+
+# The magic bytes end in the format version, also recorded in the header
+MAGIC = b"DEGSNAP2"
+VERSION = 2
+SNAPSHOT = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+ARRAYS = {
+    "person_offsets": "q", "person_movies": "i",
+    "movie_offsets": "q", "movie_people": "i", "person_order": "i"
+}
+STRINGS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years"
+)
+
+# Typecode of every section a snapshot must contain
+SECTIONS = dict(ARRAYS)
+for name in STRINGS:
+    SECTIONS[f"{name}.offsets"] = "q"
+    SECTIONS[f"{name}.blob"] = "B"
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob
+    plus an array of offsets; items are decoded on access.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def load_graph(directory):
+    """
+    Load the compact graph for `directory`, memory-mapping its snapshot
+    if one exists and still matches the CSV files, and otherwise
+    parsing the CSV files and writing a fresh snapshot.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    sources = source_stats(directory)
+    try:
+        return read_snapshot(path, sources)
+    except (OSError, ValueError):
+        pass
+
+    graph = CompactGraph.from_csv(directory)
+    try:
+        write_snapshot(graph, path, sources)
+    except OSError:
+        pass
+    return graph
+
+
+def source_stats(directory):
+    """
+    Returns the size and modification time of each CSV file,
+    used to decide whether a snapshot is stale.
+    """
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def write_snapshot(graph, path, sources):
+    """
+    Write `graph` to a binary snapshot at `path`.
+
+    The file is the magic bytes, a length-prefixed JSON header
+    and then every array, each aligned to 8 bytes.
+    """
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, getattr(graph, name)))
+    for name in STRINGS:
+        encoded = [s.encode("utf-8") for s in getattr(graph, name)]
+        offsets = array("q", [0])
+        for s in encoded:
+            offsets.append(offsets[-1] + len(s))
+        sections.append((f"{name}.offsets", offsets))
+        sections.append((f"{name}.blob", array("B", b"".join(encoded))))
+
+    layout = {}
+    position = 0
+    for name, data in sections:
+        size = len(data) * data.itemsize
+        layout[name] = [position, size, data.typecode]
+        position += align(size)
+    header = json.dumps({
+        "version": VERSION, "sources": sources, "sections": layout
+    }).encode()
+
+    # Write to a temporary file first so readers never see a partial snapshot
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(bytes(align(f.tell()) - f.tell()))
+        for name, data in sections:
+            data.tofile(f)
+            size = len(data) * data.itemsize
+            f.write(bytes(align(size) - size))
+    os.replace(temporary, path)
+
+
+def read_snapshot(path, sources=None):
+    """
+    Memory-map the snapshot at `path` as a CompactGraph.
+
+    Raises ValueError if the file is not a valid snapshot of this
+    version, or if `sources` is given and does not match the stats
+    recorded in the snapshot.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+
+    prefix = len(MAGIC) + 8
+    if len(view) < prefix or view[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    (length,) = struct.unpack_from("<Q", view, len(MAGIC))
+    try:
+        header = json.loads(bytes(view[prefix:prefix + length]))
+    except ValueError:
+        raise ValueError("corrupt snapshot header")
+    sections = check_header(header)
+    if sources is not None and header["sources"] != sources:
+        raise ValueError("snapshot is out of date")
+
+    base = align(prefix + length)
+    data = {}
+    for name, typecode in SECTIONS.items():
+        offset, size, _ = sections[name]
+        start = base + offset
+        if start + size > len(view):
+            raise ValueError("truncated snapshot")
+        data[name] = view[start:start + size].cast(typecode)
+
+    fields = {name: data[name] for name in ARRAYS}
+    for name in STRINGS:
+        fields[name] = StringTable(data[f"{name}.blob"],
+                                   data[f"{name}.offsets"])
+    check_lengths(fields)
+    graph = CompactGraph(**fields)
+
+    # Keep the mapping open for as long as the graph is alive
+    graph.buffer = buffer
+    return graph
+
+
+def check_header(header):
+    """
+    Returns the sections of a snapshot header, raising ValueError
+    unless it has this version's layout: every expected section, each
+    as [offset, size, typecode] with a whole number of items.
+    """
+    if not isinstance(header, dict) or header.get("version") != VERSION:
+        raise ValueError("unsupported snapshot version")
+    sections = header.get("sections")
+    if "sources" not in header or not isinstance(sections, dict):
+        raise ValueError("corrupt snapshot header")
+    for name, typecode in SECTIONS.items():
+        section = sections.get(name)
+        if (not isinstance(section, list) or len(section) != 3
+                or section[2] != typecode
+                or not all(isinstance(n, int) and n >= 0
+                           for n in section[:2])
+                or section[1] % array(typecode).itemsize):
+            raise ValueError(f"corrupt snapshot section {name}")
+    return sections
+
+
+def check_lengths(fields):
+    """
+    Raises ValueError unless the arrays of a snapshot agree on the
+    number of people and movies.
+    """
+    people = len(fields["person_offsets"]) - 1
+    movies = len(fields["movie_offsets"]) - 1
+    if (people < 0 or movies < 0
+            or len(fields["person_order"]) != people
+            or any(len(fields[name]) != people for name in STRINGS[:3])
+            or any(len(fields[name]) != movies for name in STRINGS[3:])
+            or fields["person_offsets"][-1] != len(fields["person_movies"])
+            or fields["movie_offsets"][-1] != len(fields["movie_people"])):
+        raise ValueError("inconsistent snapshot")
+
+
+def align(n):
+    return (n + 7) & ~7
@@ -0,0 +1,212 @@
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from snapshot import load_graph, source_stats
+
+CHECKPOINT = "stats.checkpoint"
+CHUNK = 64
+
+# Graph loaded once per worker process from the memory-mapped snapshot
+graph = None
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python stats.py directory [sources]")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    main_graph = load_graph(directory)
+    print("Data loaded.")
+
+    # Sweep from every person, or from a fixed random sample of them
+    n = main_graph.person_count()
+    if len(sys.argv) == 3:
+        if not sys.argv[2].isdigit():
+            sys.exit("Usage: python stats.py directory [sources]")
+        k = min(int(sys.argv[2]), n)
+        sources = sorted(random.Random(0).sample(range(n), k))
+    else:
+        sources = list(range(n))
+    chunks = [sources[i:i + CHUNK] for i in range(0, len(sources), CHUNK)]
+
+    path = os.path.join(directory, CHECKPOINT)
+    state = load_checkpoint(path, source_stats(directory), n, len(sources))
+    pending = [i for i in range(len(chunks)) if i not in state["done"]]
+    if state["done"]:
+        print(f"Resuming: {len(state['done'])} of {len(chunks)} chunks done.")
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(initializer=init_worker,
+                              initargs=(directory,)) as pool:
+        work = [(i, chunks[i]) for i in pending]
+        for count, (i, result) in enumerate(
+            pool.imap_unordered(sweep_chunk, work), 1
+        ):
+            merge(state, i, result)
+            save_checkpoint(path, state)
+            elapsed = time.perf_counter() - start
+            remaining = elapsed / count * (len(pending) - count)
+            print(f"\r{len(state['done'])}/{len(chunks)} chunks, "
+                  f"{remaining:.0f}s remaining", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    report(main_graph, state)
+
+
+def init_worker(directory):
+    global graph
+    graph = load_graph(directory)
+
+
+def sweep_chunk(work):
+    """
+    Runs a breadth-first search from each source in a chunk.
+    Returns the chunk's index with histograms of the distances
+    reached and of the sources' eccentricities.
+    """
+    i, sources = work
+    distances = {}
+    eccentricities = {}
+    for source in sources:
+        layers = layer_sizes(graph, source)
+        for distance, size in enumerate(layers[1:], 1):
+            distances[distance] = distances.get(distance, 0) + size
+        eccentricity = len(layers) - 1
+        eccentricities[eccentricity] = eccentricities.get(eccentricity, 0) + 1
+    return i, {"distances": distances, "eccentricities": eccentricities}
+
+
+def layer_sizes(graph, source):
+    """
+    Returns the number of people at each distance from `source`,
+    starting with the source itself at distance 0.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_people = graph.movie_people
+
+    # Each movie is expanded at most once per search
+    seen_people = bytearray(graph.person_count())
+    seen_movies = bytearray(graph.movie_count())
+    seen_people[source] = 1
+    frontier = [source]
+    sizes = [1]
+    while True:
+        layer = []
+        for person in frontier:
+            start, end = person_offsets[person], person_offsets[person + 1]
+            for movie in person_movies[start:end]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                first, last = movie_offsets[movie], movie_offsets[movie + 1]
+                for costar in movie_people[first:last]:
+                    if not seen_people[costar]:
+                        seen_people[costar] = 1
+                        layer.append(costar)
+        if not layer:
+            return sizes
+        sizes.append(len(layer))
+        frontier = layer
+
+
+def components(graph):
+    """
+    Returns the sizes of the connected components of people,
+    largest first, using union-find over each movie's stars.
+    """
+    parent = list(range(graph.person_count()))
+
+    def find(person):
+        while parent[person] != person:
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    for movie in range(graph.movie_count()):
+        stars = graph.stars_for_movie(movie)
+        if len(stars) < 2:
+            continue
+        root = find(stars[0])
+        for person in stars[1:]:
+            other = find(person)
+            if other != root:
+                parent[other] = root
+
+    sizes = {}
+    for person in range(len(parent)):
+        root = find(person)
+        sizes[root] = sizes.get(root, 0) + 1
+    return sorted(sizes.values(), reverse=True)
+
+
+def load_checkpoint(path, data, people, sources):
+    """
+    Loads sweep progress from `path`, or starts afresh if there is none
+    or it belongs to a sweep over a different graph or number of sources.
+    `data` are the stats of the CSV files, as from `source_stats`, so
+    that a checkpoint taken before the data changed is not resumed.
+    """
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        if (state["data"] == data and state["people"] == people
+                and state["sources"] == sources):
+            state["done"] = set(state["done"])
+            for field in ("distances", "eccentricities"):
+                state[field] = {int(k): v for k, v in state[field].items()}
+            return state
+    except (OSError, ValueError, KeyError):
+        pass
+    return {"data": data, "people": people, "sources": sources,
+            "done": set(), "distances": {}, "eccentricities": {}}
+
+
+def save_checkpoint(path, state):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(dict(state, done=sorted(state["done"])), f)
+    os.replace(temporary, path)
+
+
+def merge(state, i, result):
+    state["done"].add(i)
+    for field in ("distances", "eccentricities"):
+        for value, count in result[field].items():
+            state[field][value] = state[field].get(value, 0) + count
+
+
+def report(graph, state):
+    sizes = components(graph)
+    print(f"{graph.person_count()} people, {graph.movie_count()} movies.")
+    print(f"{len(sizes)} connected components; "
+          f"largest has {sizes[0] if sizes else 0} people, "
+          f"{sum(size == 1 for size in sizes)} people are isolated.")
+    print(f"Largest component sizes: {', '.join(map(str, sizes[:10]))}")
+
+    distances = state["distances"]
+    pairs = sum(distances.values())
+    print(f"Degrees of separation over {state['sources']} sources:")
+    for distance in sorted(distances):
+        share = distances[distance] / pairs
+        print(f"  {distance}: {distances[distance]} ({share:.4f})")
+    if pairs:
+        mean = sum(d * count for d, count in distances.items()) / pairs
+        print(f"Mean degrees of separation: {mean:.4f}")
+
+    eccentricities = state["eccentricities"]
+    print("Eccentricities (within each source's component):")
+    for eccentricity in sorted(eccentricities):
+        print(f"  {eccentricity}: {eccentricities[eccentricity]}")
+    if eccentricities:
+        print(f"Largest eccentricity found: {max(eccentricities)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,48 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class IndexedStackFrontier():
+    """
+    Stack frontier backed by a deque, with a hash index of the states
+    it holds so that `add`, `remove` and `contains_state` are all O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.index = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.index[node.state] = self.index.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.index
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self._pop()
+            self._forget(node.state)
+            return node
+
+    def _pop(self):
+        return self.frontier.pop()
+
+    def _forget(self, state):
+        count = self.index[state] - 1
+        if count:
+            self.index[state] = count
+        else:
+            del self.index[state]
+
+
+class IndexedQueueFrontier(IndexedStackFrontier):
+
+    def _pop(self):
+        return self.frontier.popleft()
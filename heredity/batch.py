@@ -0,0 +1,113 @@
+import csv
+import functools
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from elimination import MAX_CLIQUE, CliqueTooLarge, JunctionTree
+from factors import factors, family_order
+from model import PROBS, load_data
+from sampling import BURN_IN, CHAINS, SAMPLES, GibbsSampler
+
+COLUMNS = ["family", "person", "gene_2", "gene_1", "gene_0",
+           "trait_true", "trait_false", "method", "seconds"]
+
+# Compiled junction trees kept by each worker process
+CACHE_SIZE = 1024
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python batch.py (directory | pattern) output.csv "
+                 "[processes]")
+    paths = family_files(sys.argv[1])
+    processes = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    families = failures = 0
+    with open(sys.argv[2], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        with multiprocessing.Pool(processes) as pool:
+            for path, rows, error in pool.imap(infer_family, paths,
+                                               chunksize=16):
+                if error is not None:
+                    print(f"{path}: {error}", file=sys.stderr)
+                    failures += 1
+                    continue
+                writer.writerows(rows)
+                families += 1
+    print(f"Wrote {families} families, {failures} failed.")
+
+
+def family_files(pattern):
+    """
+    Returns the sorted paths of the family CSV files in a directory,
+    or matching a glob pattern.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+    return sorted(glob.glob(pattern))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_tree(parents):
+    """
+    Returns the junction tree for a family structure, as a tuple of
+    (mother, father) positions or None for each person, or None if it
+    would need cliques of more than MAX_CLIQUE people. Families with
+    the same structure share one compiled tree.
+    """
+    try:
+        return JunctionTree(list(parents), MAX_CLIQUE)
+    except CliqueTooLarge:
+        return None
+
+
+def infer_family(path):
+    """
+    Computes every person's marginals for one family file.
+
+    Families too interbred for exact inference within MAX_CLIQUE are
+    estimated by Gibbs sampling instead, noted in the "method" column.
+
+    Returns (path, rows, error): one row per person with the columns
+    in COLUMNS, or an error message if the file could not be used.
+    """
+    start = time.perf_counter()
+    try:
+        model = factors(PROBS)
+        people = load_data(path)
+        family = family_order(people)
+        tables = model.tables(people, family)
+        tree = compile_tree(tuple(family.parents))
+        if tree is not None:
+            method = "exact"
+            gene = tree.propagate(tables).marginals()
+        else:
+            method = "gibbs"
+            sampler = GibbsSampler(family, tables)
+            gene, _ = sampler.run(CHAINS, BURN_IN, SAMPLES,
+                                  np.random.default_rng(0))
+    except (OSError, KeyError, ValueError, MemoryError) as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+
+    rows = []
+    for name in people:
+        probabilities = model.distributions(people[name]["trait"],
+                                            gene[family.position[name]])
+        rows.append([
+            path, name,
+            *(probabilities["gene"][count] for count in (2, 1, 0)),
+            probabilities["trait"][True], probabilities["trait"][False],
+            method, seconds
+        ])
+    return path, rows, None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import heapq
+
+import numpy as np
+
+from factors import factors, family_order
+from model import PROBS
+
+# Largest clique, in people, to run exact inference with by default;
+# each clique table has 3^k entries, about 4MB for 12 people
+MAX_CLIQUE = 12
+
+
+def eliminate_probabilities(people, limit=MAX_CLIQUE):
+    """
+    Computes each person's gene and trait distribution given the
+    observed traits by message passing over a junction tree.
+
+    Returns a dictionary in the same shape as `probabilities` in `main`
+    of heredity.py. Raises CliqueTooLarge if the family needs cliques of
+    more than `limit` people, or None for no limit.
+    """
+    model = factors(PROBS)
+    family = family_order(people)
+    tree = JunctionTree(family.parents, limit)
+    gene = tree.propagate(model.tables(people, family)).marginals()
+    return {
+        name: model.distributions(people[name]["trait"],
+                                  gene[family.position[name]])
+        for name in people
+    }
+
+
+class CliqueTooLarge(ValueError):
+    """
+    Raised when a family is too interbred to compile within a limit on
+    the number of people in a clique.
+    """
+
+
+class JunctionTree():
+    """
+    The structure of a family's gene network compiled into a tree of
+    cliques, independent of any observed traits.
+
+    People are numbered 0 to n - 1, and each person's genes depend on
+    their mother's and father's. Each person is eliminated in turn,
+    each time picking the one whose elimination links the fewest
+    unlinked pairs of their neighbours; the person and their remaining
+    neighbours then form a clique. A pedigree without loops gives
+    cliques of at most three people, so inference is linear in its size.
+
+    Each clique's table has 3^k entries for k people, so with `limit`,
+    compiling raises CliqueTooLarge rather than form any clique of
+    more than `limit` people.
+    """
+
+    def __init__(self, parents, limit=None):
+        self.parents = parents
+        n = len(parents)
+
+        # Moral graph: each person is linked to their parents, and the
+        # parents of each person are linked to each other
+        adjacent = [set() for _ in range(n)]
+        for person, pair in enumerate(parents):
+            if pair is None:
+                continue
+            scope = (person,) + pair
+            for a in scope:
+                adjacent[a].update(b for b in scope if b != a)
+
+        self.order = elimination_order(adjacent, limit)
+        position = [0] * n
+        for i, person in enumerate(self.order):
+            position[person] = i
+
+        # The clique formed by eliminating order[i] is clique i, and is
+        # joined to the clique of the first of its other members to go
+        adjacent = [set(links) for links in adjacent]
+        self.cliques = []
+        self.neighbors = [[] for _ in range(n)]
+        for i, person in enumerate(self.order):
+            links = sorted(adjacent[person], key=position.__getitem__)
+            self.cliques.append((person,) + tuple(links))
+            for a in links:
+                adjacent[a].discard(person)
+                adjacent[a].update(b for b in links if b != a)
+            if links:
+                j = position[links[0]]
+                self.neighbors[i].append(j)
+                self.neighbors[j].append(i)
+
+        # Each person's factor goes to the clique of the first member of
+        # its scope to be eliminated, which holds the whole scope
+        self.home = [position[person] for person in range(n)]
+        self.owners = []
+        self.assigned = [[] for _ in range(n)]
+        for person, pair in enumerate(parents):
+            scope = (person,) if pair is None else (person,) + pair
+            owner = min(position[a] for a in scope)
+            self.owners.append(owner)
+            self.assigned[owner].append(person)
+
+    def scope(self, person):
+        """
+        Returns the people a person's factor table depends on.
+        """
+        pair = self.parents[person]
+        return (person,) if pair is None else (person,) + pair
+
+    def factor(self, person, table):
+        """
+        Returns the part of a person's 3x3x3 table that applies to them:
+        the whole table, or just the first column for people without
+        parents in the data.
+        """
+        return table if self.parents[person] is not None else table[:, 0, 0]
+
+    def propagate(self, tables):
+        """
+        Returns a Propagation of the given per-person factor tables.
+        """
+        return Propagation(self, tables)
+
+
+class Propagation():
+    """
+    Messages passed over a junction tree for one set of factor tables.
+
+    Each message from clique i to clique j is computed only when first
+    needed and then kept, so that marginals for any number of people
+    cost one message per direction of each edge of the tree.
+    """
+
+    def __init__(self, tree, tables):
+        self.tree = tree
+        self.tables = list(tables)
+        self.potentials = [self.potential(i) for i in range(len(tree.cliques))]
+        self.messages = {}
+
+    def potential(self, i):
+        """
+        Returns the product of the factors assigned to clique i, with one
+        axis per member of the clique.
+        """
+        clique = self.tree.cliques[i]
+        terms = [(np.ones((3,) * len(clique)), clique)]
+        for person in self.tree.assigned[i]:
+            terms.append((self.tree.factor(person, self.tables[person]),
+                          self.tree.scope(person)))
+        return contract(terms, clique)
+
+    def message(self, i, j):
+        """
+        Returns the message from clique i to clique j as an array with one
+        axis per person in both cliques, in clique i's order.
+        """
+        stack = [(i, j)]
+        while stack:
+            source, target = stack[-1]
+            if (source, target) in self.messages:
+                stack.pop()
+                continue
+            missing = [
+                (k, source) for k in self.tree.neighbors[source]
+                if k != target and (k, source) not in self.messages
+            ]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+            self.messages[(source, target)] = self.send(source, target)
+        return self.messages[(i, j)][0]
+
+    def send(self, i, j):
+        """
+        Computes the message from clique i to clique j from the messages
+        clique i has received from its other neighbours. Messages are
+        scaled to sum to 1 so that long pedigrees do not underflow.
+        """
+        shared = set(self.tree.cliques[j])
+        separator = tuple(a for a in self.tree.cliques[i] if a in shared)
+        terms = [(self.potentials[i], self.tree.cliques[i])]
+        terms += [self.messages[(k, i)]
+                  for k in self.tree.neighbors[i] if k != j]
+        message = contract(terms, separator)
+        return message / message.sum(), separator
+
+    def update(self, person, table):
+        """
+        Replaces a person's factor table. Only the messages sent away from
+        the clique holding that factor depend on it, so only those are
+        dropped, to be recomputed when next needed.
+        """
+        self.tables[person] = table
+        owner = self.tree.owners[person]
+        self.potentials[owner] = self.potential(owner)
+        stack = [(owner, None)]
+        while stack:
+            i, previous = stack.pop()
+            for j in self.tree.neighbors[i]:
+                if j != previous:
+                    self.messages.pop((i, j), None)
+                    stack.append((j, i))
+
+    def marginal(self, person):
+        """
+        Returns a person's gene distribution as an array of 3 values.
+        """
+        belief = self.belief(self.tree.home[person])
+        return belief.reshape(3, -1).sum(axis=1)
+
+    def belief(self, i):
+        """
+        Returns the normalized joint distribution of clique i's members.
+        """
+        for k in self.tree.neighbors[i]:
+            self.message(k, i)
+        terms = [(self.potentials[i], self.tree.cliques[i])]
+        terms += [self.messages[(k, i)] for k in self.tree.neighbors[i]]
+        belief = contract(terms, self.tree.cliques[i])
+        return belief / belief.sum()
+
+    def marginals(self):
+        """
+        Returns an (n, 3) array of each person's gene distribution.
+        """
+        marginals = np.empty((len(self.tables), 3))
+        for person in range(len(self.tables)):
+            marginals[person] = self.marginal(person)
+        return marginals
+
+
+def elimination_order(adjacent, limit=None):
+    """
+    Returns an order in which to eliminate the nodes of an undirected
+    graph, given as a list of neighbour sets, greedily choosing the node
+    whose elimination adds the fewest edges (then the fewest neighbours).
+
+    Raises CliqueTooLarge if `limit` is given and every remaining node
+    would form a clique of more than `limit` nodes.
+    """
+    adjacent = [set(links) for links in adjacent]
+
+    def fill(node):
+        links = list(adjacent[node])
+        if limit is not None and len(links) >= limit:
+            # Too many neighbours to ever be chosen; skip the count
+            return float("inf")
+        return sum(
+            1 for i, a in enumerate(links) for b in links[i + 1:]
+            if b not in adjacent[a]
+        )
+
+    scores = [(fill(node), len(adjacent[node])) for node in range(len(adjacent))]
+    heap = [(score, node) for node, score in enumerate(scores)]
+    heapq.heapify(heap)
+    eliminated = [False] * len(adjacent)
+    order = []
+    while heap:
+        score, node = heapq.heappop(heap)
+        if eliminated[node] or score != scores[node]:
+            continue
+        if limit is not None and len(adjacent[node]) >= limit:
+            raise CliqueTooLarge(
+                f"pedigree needs cliques of more than {limit} people"
+            )
+        eliminated[node] = True
+        order.append(node)
+
+        links = adjacent[node]
+        for a in links:
+            adjacent[a].discard(node)
+            adjacent[a].update(b for b in links if b != a)
+
+        # Only the scores of nodes within two links can have changed
+        affected = set(links)
+        for a in links:
+            affected.update(adjacent[a])
+        for a in affected:
+            scores[a] = (fill(a), len(adjacent[a]))
+            heapq.heappush(heap, (scores[a], a))
+    return order
+
+
+def contract(terms, output):
+    """
+    Multiplies (array, people) factors together and sums out every
+    person not in `output`, returning an array with one axis per
+    person in `output`.
+    """
+    labels = {}
+    operands = []
+    for array, people in terms:
+        operands += [array, [labels.setdefault(a, len(labels)) for a in people]]
+    operands.append([labels[a] for a in output])
+    return np.einsum(*operands)
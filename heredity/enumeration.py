@@ -0,0 +1,44 @@
+import numpy as np
+
+from factors import factors, family_order
+from model import PROBS
+
+
+def enumerate_probabilities(people):
+    """
+    Computes each person's gene and trait distribution given the
+    observed traits, by summing the joint probability of every
+    assignment of gene counts to the family.
+
+    Each assignment is a base-3 code with one digit per person, and all
+    3^n codes are evaluated at once with NumPy. Unobserved traits depend
+    only on the person's own genes, so they are summed out analytically
+    instead of being enumerated.
+
+    Returns a dictionary in the same shape as `probabilities` in `main`.
+    """
+    model = factors(PROBS)
+    family = family_order(people)
+    tables = model.tables(people, family)
+    n = len(family.names)
+
+    # Gene count of every person under every assignment code, with a
+    # last row of zeros for the parents of people without parents
+    codes = np.arange(3 ** n)
+    genes = np.zeros((n + 1, len(codes)), dtype=np.uint8)
+    for i in range(n):
+        genes[i] = (codes // 3 ** i) % 3
+
+    joint = np.ones(len(codes))
+    for i in range(n):
+        joint *= tables[i][genes[i], genes[family.mothers[i]],
+                           genes[family.fathers[i]]]
+
+    total = joint.sum()
+    probabilities = {}
+    for name in people:
+        gene = np.bincount(genes[family.position[name]], weights=joint,
+                           minlength=3) / total
+        probabilities[name] = model.distributions(people[name]["trait"],
+                                                  gene)
+    return probabilities
@@ -0,0 +1,177 @@
+import functools
+from collections import namedtuple
+
+import numpy as np
+
+# A family's people ordered parents first: their names, each person's
+# (mother, father) positions or None, and the same as index arrays in
+# which people without parents in the data point at position n
+Family = namedtuple("Family", "names position parents mothers fathers")
+
+# The tables of Factors as nested tuples
+Values = namedtuple("Values", "prior traits inheritance")
+
+# Factor tables built so far, keyed by the probabilities they came from
+cache = {}
+
+
+def factors(probs):
+    """
+    Returns the Factors for a PROBS dictionary, building them only the
+    first time those probabilities are seen.
+    """
+    gene = probs["gene"]
+    trait = probs["trait"]
+    key = (
+        gene[0], gene[1], gene[2],
+        trait[0][False], trait[0][True], trait[1][False], trait[1][True],
+        trait[2][False], trait[2][True],
+        probs["mutation"]
+    )
+    if key not in cache:
+        cache[key] = Factors(probs)
+    return cache[key]
+
+
+class Factors():
+    """
+    The probability tables of the heredity model as NumPy arrays:
+
+        prior[g]: probability of g copies of the gene without parents
+        traits[g, t]: probability of the trait being t given g copies
+        inheritance[g, m, f]: probability of g copies given a mother
+            with m copies and a father with f copies
+
+    `values` holds the same three tables as nested tuples of floats, for
+    code that looks up one entry at a time.
+    """
+
+    def __init__(self, probs):
+        self.prior = np.array([probs["gene"][g] for g in range(3)])
+        self.traits = np.array([
+            [probs["trait"][g][False], probs["trait"][g][True]]
+            for g in range(3)
+        ])
+
+        self.inheritance = np.array(inheritance(probs["mutation"]))
+
+        for table in (self.prior, self.traits, self.inheritance):
+            table.flags.writeable = False
+        self.values = Values(
+            tuple(self.prior.tolist()),
+            tuple(tuple(row) for row in self.traits.tolist()),
+            inheritance(probs["mutation"])
+        )
+
+    def tables(self, people, family):
+        """
+        Returns an (n, 3, 3, 3) array with a table for each person in the
+        family, indexed by (person's genes, mother's genes, father's
+        genes): the probability of the person's genes given their
+        parents', times the probability of their observed trait, if any.
+        For people without parents in the data, each table is the same
+        for every parent value.
+        """
+        n = len(family.names)
+        tables = np.broadcast_to(self.inheritance, (n, 3, 3, 3)).copy()
+        founders = np.array([pair is None for pair in family.parents],
+                            dtype=bool)
+        tables[founders] = self.prior[:, None, None]
+        for i, name in enumerate(family.names):
+            trait = people[name]["trait"]
+            if trait is not None:
+                tables[i] *= self.traits[:, int(trait), None, None]
+        return tables
+
+    def table(self, founder, trait):
+        """
+        Returns the 3x3x3 table of a single person, as in `tables`, for
+        someone with or without parents and an observed trait or None.
+        """
+        table = np.broadcast_to(self.prior[:, None, None] if founder
+                                else self.inheritance, (3, 3, 3)).copy()
+        if trait is not None:
+            table *= self.traits[:, int(trait), None, None]
+        return table
+
+    def distributions(self, trait, gene):
+        """
+        Returns {"gene": ..., "trait": ...} distributions for a person
+        from their marginal gene probabilities and their observed trait.
+        """
+        if trait is None:
+            has_trait = float(np.dot(gene, self.traits[:, 1]))
+        else:
+            has_trait = 1.0 if trait else 0.0
+        return {
+            "gene": {2: float(gene[2]), 1: float(gene[1]), 0: float(gene[0])},
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def inheritance(mutation):
+    """
+    Returns the inheritance table for a mutation probability as nested
+    tuples, indexed [g][m][f] as in Factors.
+    """
+    # Probability that a parent with 0, 1 or 2 copies passes one on
+    passes = (mutation, 0.5, 1 - mutation)
+    return (
+        tuple(tuple((1 - m) * (1 - f) for f in passes) for m in passes),
+        tuple(tuple(m * (1 - f) + (1 - m) * f for f in passes) for m in passes),
+        tuple(tuple(m * f for f in passes) for m in passes)
+    )
+
+
+def parent_first(people):
+    """
+    Returns the names in `people` ordered so that every person
+    comes after their mother and father.
+    """
+    order = []
+    placed = set()
+    expanded = set()
+    for name in people:
+        stack = [name]
+        while stack:
+            person = stack[-1]
+            if person in placed:
+                stack.pop()
+                continue
+            missing = [
+                parent
+                for parent in (people[person]["mother"],
+                               people[person]["father"])
+                if parent is not None and parent not in placed
+            ]
+            if missing:
+                if person in expanded:
+                    raise ValueError(f"{person} is their own ancestor")
+                expanded.add(person)
+                stack.extend(missing)
+                continue
+            stack.pop()
+            placed.add(person)
+            order.append(person)
+    return order
+
+
+def family_order(people):
+    """
+    Returns the Family for a dictionary of people from `load_data`.
+    """
+    names = parent_first(people)
+    position = {name: i for i, name in enumerate(names)}
+    parents = [
+        None if people[name]["mother"] is None
+        else (position[people[name]["mother"]],
+              position[people[name]["father"]])
+        for name in names
+    ]
+    n = len(names)
+    mothers = np.array([n if pair is None else pair[0] for pair in parents],
+                       dtype=np.int64)
+    fathers = np.array([n if pair is None else pair[1] for pair in parents],
+                       dtype=np.int64)
+    return Family(names, position, parents, mothers, fathers)
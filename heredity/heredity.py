@@ -1,41 +1,11 @@
-import csv
 import itertools
 import sys
 import copy
 
-PROBS = {
-
-    # Unconditional probabilities for having gene
-    "gene": {
-        2: 0.01,
-        1: 0.03,
-        0: 0.96
-    },
-
-    "trait": {
-
-        # Probability of trait given two copies of gene
-        2: {
-            True: 0.65,
-            False: 0.35
-        },
-
-        # Probability of trait given one copy of gene
-        1: {
-            True: 0.56,
-            False: 0.44
-        },
-
-        # Probability of trait given no gene
-        0: {
-            True: 0.01,
-            False: 0.99
-        }
-    },
-
-    # Mutation probability
-    "mutation": 0.01
-}
+from elimination import CliqueTooLarge, eliminate_probabilities
+from factors import factors, inheritance
+from model import PROBS, load_data, show
+from sampling import gibbs_probabilities
 
 
 def main():
@@ -45,76 +15,15 @@ def main():
         sys.exit("Usage: python heredity.py data.csv")
     people = load_data(sys.argv[1])
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
-        person: {
-            "gene": {
-                2: 0,
-                1: 0,
-                0: 0
-            },
-            "trait": {
-                True: 0,
-                False: 0
-            }
-        }
-        for person in people
-    }
-
-    # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
-
-        # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
-            continue
-
-        # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
-
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
+    # Exact inference, unless the family is too interbred for it
+    try:
+        probabilities = eliminate_probabilities(people)
+    except CliqueTooLarge:
+        print("Too interbred for exact inference; estimating by sampling.")
+        probabilities, _ = gibbs_probabilities(people)
 
     # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
-
-
-def load_data(filename):
-    """
-    Load gene and trait data from a file into a dictionary.
-    File assumed to be a CSV containing fields name, mother, father, trait.
-    mother, father must both be blank, or both be valid names in the CSV.
-    trait should be 0 or 1 if trait is known, blank otherwise.
-    """
-    data = dict()
-    with open(filename) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
-            data[name] = {
-                "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
-            }
-    return data
+    show(probabilities)
 
 
 def powerset(s):
@@ -138,84 +47,44 @@ def child(Mgene, Fgene):
     Calculates the probability distribution of a child's genes 
     based on the probability distributions of the parents
     '''
-    pBoth = 1
-    distribution = {0:0, 1:0, 2:0}
-    mutation_chance = PROBS['mutation']
-    if Mgene == 0:
-        Mpass_down = mutation_chance
-    elif Mgene == 1:
-        Mpass_down = 0.5
-    elif Mgene == 2:
-        Mpass_down = 1 - mutation_chance
-            
-    if Fgene == 0:
-        Fpass_down = mutation_chance
-    elif Fgene == 1:
-        Fpass_down = 0.5
-    elif Fgene == 2:
-        Fpass_down = 1 - mutation_chance
+    table = inheritance(PROBS["mutation"])
+    return {genes: table[genes][Mgene][Fgene] for genes in range(3)}
+
 
-    distribution[0] = distribution[0] + (1 - Mpass_down) * (1 - Fpass_down) * pBoth
-    distribution[1] = distribution[1] + ((Mpass_down) * (1 - Fpass_down) + (1 - Mpass_down) * (Fpass_down)) * pBoth
-    distribution[2] = distribution[2] + (Mpass_down) * (Fpass_down) * pBoth
-    return distribution
+def gene_count(person, one_gene, two_genes):
+    if person in two_genes:
+        return 2
+    if person in one_gene:
+        return 1
+    return 0
 
 
-def x_gene(person, people, x, have_trait, one_gene, two_genes):
+def x_gene(person, people, x, have_trait, one_gene, two_genes, genes=None,
+           values=None):
+    """
+    Probability that `person` has `x` copies of the gene given their
+    parents' copies, times the probability of their trait being as in
+    `have_trait`. `genes`, if given, maps each person to their number
+    of copies, saving the set lookups for the parents, and `values`
+    are the tables of factors(PROBS).values, saving looking them up.
+    """
+    if values is None:
+        values = factors(PROBS).values
+    x = int(x)
+    has_trait = values.traits[x][person in have_trait]
     mother = people[person]['mother']
     father = people[person]['father']
-    trait = people[person]['trait']
-    if mother == None and father == None:
-        #if trait == None:
-            #return PROBS["gene"][int(x)]
-        if person in have_trait:
-            return PROBS["trait"][int(x)][True] * PROBS["gene"][int(x)]
-        elif person not in have_trait:
-            return PROBS["trait"][int(x)][False] * PROBS["gene"][int(x)]
-        else:
-            raise ValueError
+    if mother is None and father is None:
+        return values.prior[x] * has_trait
+    if genes is None:
+        mother_genes = gene_count(mother, one_gene, two_genes)
+        father_genes = gene_count(father, one_gene, two_genes)
     else:
-        if mother in one_gene:
-            mother_genes = 1
-        elif mother in two_genes:
-            mother_genes = 2
-        else:
-            mother_genes = 0
-        
-        if father in one_gene:
-            father_genes = 1
-        elif father in two_genes:
-            father_genes = 2
-        else:
-            father_genes = 0
-        '''
-        if mother_trait == True:
-            mother_genes[0] = PROBS["trait"][0][True] * PROBS["gene"][0]
-            mother_genes[1] = PROBS["trait"][1][True] * PROBS["gene"][1]
-            mother_genes[2] = PROBS["trait"][2][True] * PROBS["gene"][2]
-        else:
-            mother_genes[0] = PROBS["trait"][0][False] * PROBS["gene"][0]
-            mother_genes[1] = PROBS["trait"][1][False] * PROBS["gene"][1]
-            mother_genes[2] = PROBS["trait"][2][False] * PROBS["gene"][2]
-        
-        if father_trait == True:
-            father_genes[0] = PROBS["trait"][0][True] * PROBS["gene"][0]
-            father_genes[1] = PROBS["trait"][1][True] * PROBS["gene"][1]
-            father_genes[2] = PROBS["trait"][2][True] * PROBS["gene"][2]
-        else:
-            father_genes[0] = PROBS["trait"][0][False] * PROBS["gene"][0]
-            father_genes[1] = PROBS["trait"][1][False] * PROBS["gene"][1]
-            father_genes[2] = PROBS["trait"][2][False] * PROBS["gene"][2]
-        
-        '''
-        gene_distribution = child(mother_genes, father_genes)
-        if person in have_trait:
-            return gene_distribution[int(x)] * PROBS["trait"][int(x)][True]
-        elif person not in have_trait:
-            return gene_distribution[int(x)] * PROBS["trait"][int(x)][False]
-        else:
-            return gene_distribution[int(x)]
-    
+        mother_genes = genes[mother]
+        father_genes = genes[father]
+    return values.inheritance[x][mother_genes][father_genes] * has_trait
+
+
 def has_trait(person, people):
     gene_distribution = dict()
     for x in range(3):
@@ -234,27 +103,15 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
+    values = factors(PROBS).values
+    genes = {
+        person: gene_count(person, one_gene, two_genes) for person in people
+    }
     joint = 1
-
     for person in people:
-        if person in one_gene:
-            joint = joint * x_gene(person, people, 1, have_trait, one_gene, two_genes)
-            
-        elif person in two_genes:
-            joint = joint * x_gene(person, people, 2, have_trait, one_gene, two_genes)
-            
-        else:
-            joint = joint * x_gene(person, people, 0, have_trait, one_gene, two_genes)
-            
-        
-        #if person in have_trait:
-            #if people[person]['trait'] == None:
-                #joint = joint * has_trait(person, people)
-        #else:
-            #if people[person]['trait'] == None:
-                #joint = joint * (1 - has_trait(person, people))
-
-    return joint
+        joint = joint * x_gene(person, people, genes[person], have_trait,
+                               one_gene, two_genes, genes, values)
+    return float(joint)
 
 
 def update(probabilities, one_gene, two_genes, have_trait, p):
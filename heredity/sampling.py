@@ -0,0 +1,196 @@
+import sys
+
+import numpy as np
+
+from factors import factors, family_order
+from model import PROBS, load_data, show
+
+CHAINS = 4
+BURN_IN = 500
+SAMPLES = 2000
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python sampling.py data.csv")
+    people = load_data(sys.argv[1])
+    probabilities, r_hat = gibbs_probabilities(people)
+    show(probabilities)
+    print(f"Largest R-hat: {r_hat:.4f}")
+
+
+def gibbs_probabilities(people, chains=CHAINS, burn_in=BURN_IN,
+                        samples=SAMPLES, seed=None):
+    """
+    Estimates each person's gene and trait distribution given the
+    observed traits by Gibbs sampling, for pedigrees too large or too
+    inbred for exact inference.
+
+    Returns (probabilities, r_hat): a dictionary in the same shape as
+    `probabilities` in `main` of heredity.py, and the largest
+    Gelman-Rubin statistic over all gene distributions, which is close
+    to 1 once the chains agree.
+    """
+    model = factors(PROBS)
+    family = family_order(people)
+    sampler = GibbsSampler(family, model.tables(people, family))
+    gene, r_hat = sampler.run(chains, burn_in, samples,
+                              np.random.default_rng(seed))
+    probabilities = {
+        name: model.distributions(people[name]["trait"],
+                                  gene[family.position[name]])
+        for name in people
+    }
+    return probabilities, r_hat
+
+
+class GibbsSampler():
+    """
+    Gibbs sampling of everyone's gene counts, over many chains at once.
+
+    People are split into blocks in which nobody is a parent, child or
+    co-parent of anyone else, so each block's gene counts are
+    independent given everyone else's and are resampled together.
+    """
+
+    def __init__(self, family, tables):
+        n = len(family.names)
+        self.n = n
+
+        # People without parents point at a dummy person n, whose gene
+        # count is always 0; their tables ignore the parent axes
+        self.mothers = family.mothers
+        self.fathers = family.fathers
+        with np.errstate(divide="ignore"):
+            self.log_tables = np.log(tables)
+
+        adjacent = [set() for _ in range(n)]
+        for person, pair in enumerate(family.parents):
+            if pair is None:
+                continue
+            scope = (person,) + pair
+            for a in scope:
+                adjacent[a].update(b for b in scope if b != a)
+        self.blocks = [self.block(people) for people in coloring(adjacent)]
+
+    def block(self, people):
+        """
+        Returns the index arrays used to resample a block of people:
+        the people, and for each of their children the child, the
+        position of the parent within the block and the other parent,
+        split by whether the parent is the child's mother or father.
+        """
+        people = np.array(people, dtype=np.int64)
+        within = {person: i for i, person in enumerate(people.tolist())}
+        children = np.flatnonzero(self.mothers < self.n)
+        roles = []
+        for parents, others in ((self.mothers, self.fathers),
+                                (self.fathers, self.mothers)):
+            mask = np.isin(parents[children], people)
+            child = children[mask]
+            owner = np.array([within[p] for p in parents[child].tolist()],
+                             dtype=np.int64)
+            roles.append((child, owner, others[child]))
+        return people, roles[0], roles[1]
+
+    def conditionals(self, genes, block):
+        """
+        Returns the distribution of each block member's gene count given
+        everyone else's, with shape (block size, chains, 3).
+        """
+        people, (child, owner, father), (child_f, owner_f, mother) = block
+        tables = self.log_tables
+        logits = tables[people[:, None], :,
+                        genes[self.mothers[people]],
+                        genes[self.fathers[people]]]
+        np.add.at(logits, owner,
+                  tables[child[:, None], genes[child], :, genes[father]])
+        np.add.at(logits, owner_f,
+                  tables[child_f[:, None], genes[child_f], genes[mother], :])
+        logits -= logits.max(axis=2, keepdims=True)
+        weights = np.exp(logits)
+        return weights / weights.sum(axis=2, keepdims=True)
+
+    def initial(self, chains, rng):
+        """
+        Draws starting gene counts for every chain from the gene model
+        alone, parents before children, ignoring observed traits.
+        """
+        genes = np.zeros((self.n + 1, chains), dtype=np.int64)
+        tables = np.exp(self.log_tables)
+        for person in range(self.n):
+            prior = tables[person][:, genes[self.mothers[person]],
+                                   genes[self.fathers[person]]]
+            genes[person] = draw(prior.T / prior.sum(axis=0)[:, None], rng)
+        return genes
+
+    def run(self, chains, burn_in, samples, rng):
+        """
+        Runs `chains` chains for `burn_in` discarded sweeps and then
+        `samples` kept sweeps. Each kept sweep adds every person's
+        conditional gene distribution rather than the drawn count, which
+        gives lower-variance estimates from the same draws.
+
+        Returns (marginals, r_hat) with marginals as an (n, 3) array.
+        """
+        genes = self.initial(chains, rng)
+        total = np.zeros((self.n, chains, 3))
+        squares = np.zeros((self.n, chains, 3))
+        for sweep in range(burn_in + samples):
+            for block in self.blocks:
+                probabilities = self.conditionals(genes, block)
+                genes[block[0]] = draw(probabilities, rng)
+                if sweep >= burn_in:
+                    total[block[0]] += probabilities
+                    squares[block[0]] += probabilities ** 2
+
+        means = total / samples
+        marginals = means.mean(axis=1)
+        return marginals, r_hat(means, squares / samples, samples)
+
+
+def r_hat(means, squares, samples):
+    """
+    Returns the largest Gelman-Rubin statistic from per-chain means and
+    mean squares of shape (people, chains, 3), ignoring values that are
+    constant within every chain.
+    """
+    chains = means.shape[1]
+    if chains < 2 or samples < 2:
+        return float("nan")
+    within = (squares - means ** 2).mean(axis=1) * samples / (samples - 1)
+    between = means.var(axis=1, ddof=1) * samples
+    pooled = (samples - 1) / samples * within + between / samples
+    varying = within > 1e-12
+    if not varying.any():
+        return 1.0
+    return float(np.sqrt(pooled[varying] / within[varying]).max())
+
+
+def draw(probabilities, rng):
+    """
+    Draws a value from 0 to 2 from each distribution along the last
+    axis of `probabilities`.
+    """
+    cumulative = probabilities.cumsum(axis=-1)
+    uniform = rng.random(probabilities.shape[:-1] + (1,))
+    return np.minimum((uniform > cumulative).sum(axis=-1), 2)
+
+
+def coloring(adjacent):
+    """
+    Greedily colors a graph given as a list of neighbour sets, most
+    linked nodes first, and returns the nodes of each color.
+    """
+    colors = {}
+    for node in sorted(range(len(adjacent)), key=lambda a: -len(adjacent[a])):
+        used = {colors[a] for a in adjacent[node] if a in colors}
+        colors[node] = next(c for c in range(len(used) + 1) if c not in used)
+    blocks = [[] for _ in range(max(colors.values(), default=-1) + 1)]
+    for node in range(len(adjacent)):
+        blocks[colors[node]].append(node)
+    return blocks
+
+
+if __name__ == "__main__":
+    main()
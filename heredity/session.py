@@ -0,0 +1,92 @@
+import sys
+import time
+
+from elimination import MAX_CLIQUE, CliqueTooLarge, JunctionTree
+from factors import factors, family_order
+from model import PROBS, load_data, show
+
+TRAITS = {"1": True, "0": False, "?": None}
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python session.py data.csv")
+    try:
+        session = Session(load_data(sys.argv[1]))
+    except CliqueTooLarge as e:
+        sys.exit(f"Too interbred for exact inference: {e}.")
+    show(session.probabilities())
+
+    # Each line of input is a name and a trait of 1, 0 or ? to forget it
+    for line in sys.stdin:
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 2 or fields[1] not in TRAITS:
+            print("Expected: name 1|0|?")
+            continue
+        start = time.perf_counter()
+        try:
+            probabilities = session.observe(fields[0], TRAITS[fields[1]])
+        except KeyError:
+            print(f"No person named {fields[0]}.")
+            continue
+        elapsed = time.perf_counter() - start
+        show(probabilities)
+        print(f"Updated in {elapsed * 1000:.2f} ms.")
+
+
+class Session():
+    """
+    Inference for one family as traits are observed one at a time.
+
+    The family's junction tree and the messages passed over it are kept
+    between observations. Observing a trait changes a single factor,
+    so only the messages sent away from the clique holding it are
+    recomputed, and only once probabilities are asked for.
+
+    Raises CliqueTooLarge if the family needs cliques of more than
+    `limit` people, as for `eliminate_probabilities`.
+    """
+
+    def __init__(self, people, limit=MAX_CLIQUE):
+        self.people = {name: dict(person) for name, person in people.items()}
+        self.model = factors(PROBS)
+        self.family = family_order(self.people)
+        self.tree = JunctionTree(self.family.parents, limit)
+        self.propagation = self.tree.propagate(
+            self.model.tables(self.people, self.family)
+        )
+
+    def observe(self, person, trait):
+        """
+        Records that `person` has the trait (True), does not (False), or
+        is no longer known either way (None), and returns everyone's
+        updated probabilities as from `probabilities`.
+
+        Raises KeyError if there is no such person.
+        """
+        i = self.family.position[person]
+        self.people[person]["trait"] = trait
+        founder = self.family.parents[i] is None
+        self.propagation.update(i, self.model.table(founder, trait))
+        return self.probabilities()
+
+    def probability(self, person):
+        """
+        Returns {"gene": ..., "trait": ...} distributions for one person.
+        Only the messages that person's marginal needs are recomputed.
+        """
+        gene = self.propagation.marginal(self.family.position[person])
+        return self.model.distributions(self.people[person]["trait"], gene)
+
+    def probabilities(self):
+        """
+        Returns a dictionary in the same shape as `probabilities` in
+        `main` of heredity.py, for the traits observed so far.
+        """
+        return {person: self.probability(person) for person in self.people}
+
+
+if __name__ == "__main__":
+    main()
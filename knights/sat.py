@@ -0,0 +1,235 @@
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class Encoder():
+    """
+    Converts sentences to clauses in conjunctive normal form by the
+    Tseitin transformation.
+
+    Each symbol becomes a variable numbered from 1, and each compound
+    sentence becomes a new variable constrained to equal it, so the
+    clauses grow linearly with the sentence instead of exponentially.
+    A literal is a variable number, negated when the variable is false.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.sentences = {}
+        self.clauses = []
+        self.count = 0
+
+    def copy(self):
+        encoder = Encoder()
+        encoder.variables = dict(self.variables)
+        encoder.sentences = dict(self.sentences)
+        encoder.clauses = list(self.clauses)
+        encoder.count = self.count
+        return encoder
+
+    def variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        """
+        Returns the variable for a symbol name, numbering it if new.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.variable()
+        return self.variables[name]
+
+    def require(self, sentence):
+        """
+        Adds clauses that hold exactly when `sentence` is true.
+        Conjunctions and disjunctions at the top need no new variables.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.require(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when `sentence` is.
+        """
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.sentences:
+            return self.sentences[sentence]
+
+        if isinstance(sentence, And):
+            literals = [self.literal(c) for c in sentence.conjuncts]
+            x = self.variable()
+            self.clauses.extend([-x, literal] for literal in literals)
+            self.clauses.append([x] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.literal(d) for d in sentence.disjuncts]
+            x = self.variable()
+            self.clauses.extend([x, -literal] for literal in literals)
+            self.clauses.append([-x] + literals)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.variable()
+            self.clauses.extend([[-x, -a, b], [x, a], [x, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.variable()
+            self.clauses.extend([
+                [-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]
+            ])
+        else:
+            raise TypeError(f"cannot encode {type(sentence).__name__}")
+        self.sentences[sentence] = x
+        return x
+
+
+def solve(clauses, count):
+    """
+    Decides whether clauses over variables 1 to `count` can all be
+    satisfied, by DPLL search with unit propagation over two watched
+    literals per clause.
+
+    Returns a list of the value of each variable, indexed from 1, that
+    satisfies every clause, or None if there is none.
+    """
+    value = [0] * (count + 1)
+    trail = []
+    watches = {}
+    units = []
+    occurrences = [0] * (count + 1)
+
+    # Drop clauses that always hold and repeated literals
+    database = []
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            continue
+        if not clause:
+            return None
+        for literal in clause:
+            occurrences[abs(literal)] += 1
+        if len(clause) == 1:
+            units.append(clause[0])
+            continue
+        for literal in clause[:2]:
+            watches.setdefault(literal, []).append(len(database))
+        database.append(clause)
+
+    def assign(literal):
+        value[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    def true(literal):
+        v = value[abs(literal)]
+        return v if literal > 0 else -v
+
+    def propagate(start):
+        """
+        Assigns every literal implied by the assignments on the trail
+        from `start`, returning False on a conflict.
+        """
+        while start < len(trail):
+            false = -trail[start]
+            start += 1
+            watching = watches.get(false, [])
+            kept = []
+            for n, index in enumerate(watching):
+                clause = database[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if true(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if true(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if true(clause[0]) == -1:
+                        kept.extend(watching[n + 1:])
+                        watches[false] = kept
+                        return False
+                    assign(clause[0])
+            watches[false] = kept
+        return True
+
+    for literal in units:
+        if true(literal) == -1:
+            return None
+        if true(literal) == 0:
+            assign(literal)
+    if not propagate(0):
+        return None
+
+    # Branch on the variables that appear most often first
+    order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+    decisions = []
+    while True:
+        variable = next((v for v in order if value[v] == 0), None)
+        if variable is None:
+            return value
+        decisions.append((len(trail), -variable, False))
+        assign(-variable)
+
+        while not propagate(len(trail) - 1):
+            # Undo decisions until one can still be flipped
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                return None
+            size, literal, _ = decisions.pop()
+            for undone in trail[size:]:
+                value[abs(undone)] = 0
+            del trail[size:]
+            decisions.append((size, -literal, True))
+            assign(-literal)
+
+
+class KnowledgeBase():
+    """
+    A knowledge base compiled to clauses once, so that many queries
+    against it each only encode the query itself.
+    """
+
+    def __init__(self, knowledge):
+        self.encoder = Encoder()
+        self.encoder.require(knowledge)
+
+    def entails(self, query):
+        """
+        Returns whether the knowledge base entails `query`, that is,
+        whether the knowledge base together with not `query` cannot
+        be satisfied.
+        """
+        encoder = self.encoder.copy()
+        encoder.require(Not(query))
+        return solve(encoder.clauses, encoder.count) is None
+
+    def model(self):
+        """
+        Returns a dictionary of symbol names to values in which the
+        knowledge base is true, or None if there is no such model.
+        """
+        value = solve(self.encoder.clauses, self.encoder.count)
+        if value is None:
+            return None
+        return {name: value[v] == 1
+                for name, v in self.encoder.variables.items()}
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query, like `model_check`."""
+    return KnowledgeBase(knowledge).entails(query)
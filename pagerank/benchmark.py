@@ -0,0 +1,186 @@
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from pagerank import DAMPING, SAMPLES, iterate_pagerank, sample_pagerank
+from outofcore import outofcore_pagerank, write_edge_file
+from sampling import surfer_pagerank
+from sparse import LinkGraph, power_iteration, sparse_pagerank
+
+SIZES = (10, 100, 1000, 10000, 100000)
+REFERENCE_TOLERANCE = 1e-14
+
+# Largest corpora the original quadratic estimators are run on
+ITERATE_LIMIT = 100
+SAMPLE_LIMIT = 100
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python benchmark.py report.json")
+    report = run_benchmarks()
+    with open(sys.argv[1], "w") as f:
+        json.dump(report, f, indent=2)
+    for result in report["results"]:
+        if "error" in result:
+            outcome = f"failed: {result['error']}"
+        else:
+            outcome = f"L1 error {result['l1_error']:.2e}"
+        print(f"{result['corpus']:>10} {result['pages']:>7} "
+              f"{result['estimator']:>10} {result['seconds']:>9.4f}s "
+              f"{outcome}")
+
+
+def generate_corpus(kind, pages, seed=0):
+    """
+    Returns a synthetic corpus dictionary of `pages` pages, named
+    0.html, 1.html, ..., of one of the kinds:
+
+        "power_law": preferential attachment, a few pages get most links
+        "linked": like power_law, but the first page links to the second,
+            so that no page is without links
+        "chain": each page links only to the next one
+        "cycle": like chain, but the last page links back to the first
+        "dangling": like power_law, but half the pages have no links
+
+    Only "linked" and "cycle" suit `sample_pagerank`, which fails on
+    pages without links.
+    """
+    rng = random.Random(seed)
+    names = [f"{i}.html" for i in range(pages)]
+    corpus = {name: set() for name in names}
+    if kind in ("chain", "cycle"):
+        for i in range(pages - 1):
+            corpus[names[i]].add(names[i + 1])
+        if kind == "cycle" and pages > 1:
+            corpus[names[-1]].add(names[0])
+        return corpus
+    if kind not in ("power_law", "linked", "dangling"):
+        raise ValueError(f"unknown corpus kind: {kind}")
+
+    # Each page links to earlier pages, picked in proportion to the
+    # links they have already received
+    targets = [0]
+    for i in range(1, pages):
+        for _ in range(min(i, 3)):
+            j = rng.choice(targets) if rng.random() < 0.8 else rng.randrange(i)
+            corpus[names[i]].add(names[j])
+            targets.append(j)
+        targets.append(i)
+    if kind == "linked" and pages > 1:
+        corpus[names[0]].add(names[1])
+    if kind == "dangling":
+        for name in rng.sample(names, pages // 2):
+            corpus[name] = set()
+    return corpus
+
+
+def estimators():
+    """
+    Returns (name, function, size limit) for each estimator, where
+    each function maps a corpus to (ranks dictionary, iterations).
+    """
+    def iterate(corpus):
+        return iterate_pagerank(corpus, DAMPING), 10000
+
+    def sample(corpus):
+        return sample_pagerank(corpus, DAMPING, SAMPLES), None
+
+    def sparse(corpus):
+        return sparse_pagerank(corpus, DAMPING)
+
+    def surfer(corpus):
+        return surfer_pagerank(corpus, DAMPING, SAMPLES * 100, seed=0), None
+
+    def outofcore(corpus):
+        graph = LinkGraph.from_corpus(corpus)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "edges.bin")
+            write_edge_file(path, graph.pages, graph.sources(), graph.links)
+            ranks, iterations, _ = outofcore_pagerank(path, DAMPING)
+        return dict(zip(graph.pages, ranks.tolist())), iterations
+
+    return [
+        ("iterate", iterate, ITERATE_LIMIT),
+        ("sample", sample, SAMPLE_LIMIT),
+        ("sparse", sparse, None),
+        ("surfer", surfer, None),
+        ("outofcore", outofcore, None)
+    ]
+
+
+def reference(corpus):
+    """
+    Returns high-precision PageRank values for a corpus.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, _ = power_iteration(graph, DAMPING, REFERENCE_TOLERANCE,
+                               max_iterations=100000)
+    return dict(zip(graph.pages, ranks.tolist()))
+
+
+def run_benchmarks(kinds=("power_law", "linked", "chain", "cycle",
+                          "dangling"), sizes=SIZES):
+    """
+    Runs every estimator on every generated corpus and returns a report
+    with the wall time, peak traced memory, iteration count and L1 error
+    against the reference ranks of each run.
+    """
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            corpus = generate_corpus(kind, size)
+            expected = reference(corpus)
+            for name, estimator, limit in estimators():
+                if limit is not None and size > limit:
+                    continue
+                results.append(measure(kind, size, name, estimator,
+                                       corpus, expected))
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "damping": DAMPING,
+        "results": results
+    }
+
+
+def measure(kind, size, name, estimator, corpus, expected):
+    """
+    Times one estimator run, then repeats it under tracemalloc to find
+    its peak memory, so that tracing does not slow the timed run.
+    """
+    result = {"corpus": kind, "pages": size, "estimator": name}
+    start = time.perf_counter()
+    try:
+        ranks, iterations = estimator(corpus)
+    except Exception as e:
+        result["seconds"] = time.perf_counter() - start
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["peak_memory_bytes"] = None
+        result["iterations"] = None
+        result["l1_error"] = None
+        return result
+    result["seconds"] = time.perf_counter() - start
+
+    tracemalloc.start()
+    estimator(corpus)
+    result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result["iterations"] = iterations
+    result["l1_error"] = sum(
+        abs(ranks.get(page, 0) - expected[page]) for page in expected
+    )
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from sparse import LinkGraph
+
+# Bytes read from a file at a time
+CHUNK = 1 << 16
+
+# Longest unfinished tag carried from one chunk into the next
+MAX_TAG = 1 << 16
+
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python crawler.py corpus")
+    graph, stats = crawl_graph(sys.argv[1])
+    print(f"Crawled {stats['files']} files ({stats['bytes']} bytes) "
+          f"in {stats['seconds']:.3f}s: "
+          f"{stats['files_per_second']:.0f} files/s, "
+          f"{stats['megabytes_per_second']:.2f} MB/s")
+    print(f"{len(graph)} pages, {len(graph.links)} links.")
+
+
+def crawl_graph(directory, processes=None):
+    """
+    Parse a directory of HTML pages in a process pool and return
+    (graph, stats): a LinkGraph of the links between pages in the corpus,
+    and a dictionary of throughput statistics.
+
+    Produces the same links as `crawl`, without holding whole files
+    or the corpus dictionary in memory.
+    """
+    start = time.perf_counter()
+    pages = sorted(
+        entry.name for entry in os.scandir(directory)
+        if entry.name.endswith(".html")
+    )
+    index = {page: i for i, page in enumerate(pages)}
+
+    sources = []
+    targets = []
+    total = 0
+    paths = [os.path.join(directory, page) for page in pages]
+    with multiprocessing.Pool(processes) as pool:
+        for path, links, size in pool.imap_unordered(
+            extract_links, paths, chunksize=64
+        ):
+            total += size
+            source = index[os.path.basename(path)]
+            for link in links:
+                target = index.get(link)
+                if target is not None:
+                    sources.append(source)
+                    targets.append(target)
+
+    graph = LinkGraph.from_edges(pages, sources, targets)
+    seconds = time.perf_counter() - start
+    stats = {
+        "files": len(pages),
+        "bytes": total,
+        "seconds": seconds,
+        "files_per_second": len(pages) / seconds if seconds else 0,
+        "megabytes_per_second": total / 1e6 / seconds if seconds else 0
+    }
+    return graph, stats
+
+
+def extract_links(path):
+    """
+    Reads an HTML file in chunks and returns (path, links, size):
+    the set of link targets found in it and the number of bytes read.
+    """
+    links = set()
+    size = 0
+    carry = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            buffer = carry + chunk
+            for match in LINK.finditer(buffer):
+                links.add(match.group(1).decode("utf-8", "replace"))
+
+            # Carry an unfinished tag over into the next chunk
+            tag = buffer.rfind(b"<")
+            if (tag != -1 and len(buffer) - tag <= MAX_TAG
+                    and buffer.find(b">", tag) == -1):
+                carry = buffer[tag:]
+            else:
+                carry = b""
+    return path, links, size
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import json
+import sys
+from collections import deque
+
+import numpy as np
+
+from pagerank import DAMPING
+from crawler import crawl_graph
+from sparse import LinkGraph, TransitionMatrix, power_iteration
+
+TOLERANCE = 1e-10
+
+# Share of pages whose residual may exceed the threshold before a
+# vectorized sweep over every page is cheaper than pushing page by page
+GLOBAL_SHARE = 0.01
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python incremental.py corpus state.npz [diff.json]")
+    corpus, path = sys.argv[1], sys.argv[2]
+
+    try:
+        graph, ranks = load_state(path)
+    except OSError:
+        # No saved ranks yet: rank the corpus from scratch
+        graph, _ = crawl_graph(corpus)
+        ranks, iterations = power_iteration(graph, DAMPING)
+        save_state(path, graph, ranks)
+        print(f"Ranked {len(graph)} pages in {iterations} iterations.")
+        return
+
+    previous = dict(zip(graph.pages, ranks.tolist()))
+    if len(sys.argv) == 4:
+        with open(sys.argv[3]) as f:
+            graph = apply_diff(graph, json.load(f))
+    else:
+        graph, _ = crawl_graph(corpus)
+
+    ranks, pushes = incremental_pagerank(graph, DAMPING, previous)
+    save_state(path, graph, ranks)
+    print(f"Updated {len(graph)} pages with {pushes} pushes.")
+
+
+def save_state(path, graph, ranks):
+    """
+    Saves a graph and its rank vector to a NumPy .npz file.
+    """
+    np.savez(path, pages=np.array(graph.pages, dtype=str),
+             offsets=graph.offsets, links=graph.links, ranks=ranks)
+
+
+def load_state(path):
+    """
+    Loads a (graph, ranks) pair saved by `save_state`.
+    """
+    with np.load(path) as state:
+        graph = LinkGraph(state["pages"].tolist(), state["offsets"],
+                          state["links"])
+        return graph, state["ranks"]
+
+
+def apply_diff(graph, diff):
+    """
+    Returns a new LinkGraph with a link diff applied. The diff is a
+    dictionary with any of the keys:
+
+        "removed_pages": names of pages to drop, with all their links
+        "added_pages": names of new pages
+        "removed_links": [source, target] pairs of page names
+        "added_links": [source, target] pairs of page names
+
+    Links to pages not in the resulting corpus are ignored.
+    """
+    removed = set(diff.get("removed_pages", ()))
+    existing = set(graph.pages)
+    pages = [page for page in graph.pages if page not in removed]
+    pages += [page for page in dict.fromkeys(diff.get("added_pages", ()))
+              if page not in removed and page not in existing]
+    index = {page: i for i, page in enumerate(pages)}
+    n = len(pages)
+
+    # Carry over existing links between surviving pages
+    renumber = np.array([index.get(page, -1) for page in graph.pages],
+                        dtype=np.int64)
+    sources = renumber[graph.sources()]
+    targets = renumber[graph.links]
+    keep = (sources >= 0) & (targets >= 0)
+    edges = sources[keep] * n + targets[keep]
+
+    def encode(pairs):
+        return np.array([
+            index[source] * n + index[target]
+            for source, target in pairs
+            if source in index and target in index
+        ], dtype=np.int64)
+
+    edges = edges[~np.isin(edges, encode(diff.get("removed_links", ())))]
+    edges = np.concatenate([edges, encode(diff.get("added_links", ()))])
+    sources, targets = np.divmod(edges, n)
+    return LinkGraph.from_edges(pages, sources, targets)
+
+
+def incremental_pagerank(graph, damping_factor, previous,
+                         tolerance=TOLERANCE):
+    """
+    Re-converges PageRank after the corpus changes, starting from the
+    `previous` ranks (a dictionary of page name to rank) rather than
+    from uniform ranks.
+
+    Computes the residual of the warm start once, then repeatedly pushes
+    each page's residual into its rank and on to the pages it links to,
+    only while some page's residual exceeds `tolerance` / pages. Pages
+    far from the change keep residuals below that and are never touched.
+    Whenever the change spreads to more than a small share of the pages,
+    a vectorized sweep over every page is used instead.
+
+    Returns (ranks, pushes) with ranks as an array indexed by page number.
+    """
+    n = len(graph)
+    ranks = np.array([previous.get(page, 1 / n) for page in graph.pages])
+    ranks /= ranks.sum()
+
+    matrix = TransitionMatrix(graph)
+    degree = graph.out_degree()
+
+    def residual_of(ranks):
+        return (
+            (1 - damping_factor) / n
+            + damping_factor * (matrix.dot(ranks)
+                                + ranks[matrix.dangling].sum() / n)
+            - ranks
+        )
+
+    threshold = tolerance / n
+    limit = max(1, GLOBAL_SHARE * n)
+    residual = residual_of(ranks)
+    pushes = 0
+    while True:
+        active = np.flatnonzero(np.abs(residual) > threshold)
+        if len(active) == 0:
+            break
+        if len(active) > limit:
+            # The change reached much of the corpus, for example because
+            # pages were added or removed; sweep every page at once
+            ranks += residual
+            residual = residual_of(ranks)
+            continue
+        queue = deque(active.tolist())
+        queued = np.zeros(n, dtype=bool)
+        queued[active] = True
+        while queue and len(queue) <= limit:
+            page = queue.popleft()
+            queued[page] = False
+            mass = residual[page]
+            if abs(mass) <= threshold:
+                continue
+            ranks[page] += mass
+            residual[page] = 0
+            pushes += 1
+
+            if degree[page] == 0:
+                # Dangling pages spread their mass over every page; pages
+                # this lifts over the threshold are found by the next scan
+                residual += damping_factor * mass / n
+                continue
+            links = graph.links[graph.offsets[page]:graph.offsets[page + 1]]
+            residual[links] += damping_factor * mass / degree[page]
+            for link in links[np.abs(residual[links]) > threshold].tolist():
+                if not queued[link]:
+                    queued[link] = True
+                    queue.append(link)
+
+    return ranks, pushes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from pagerank import DAMPING, crawl
+from sampling import SurferSampler
+from sparse import LinkGraph
+
+# Target standard error of every page's estimate
+PRECISION = 0.001
+
+# Samples drawn by each independent batch of surfers
+BATCH = 100000
+
+# Fewest batches to run before trusting the error estimate
+MIN_BATCHES = 8
+MAX_SAMPLES = 10 ** 9
+
+# Sampler built once per worker process
+sampler = None
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python montecarlo.py corpus [precision]")
+    precision = float(sys.argv[2]) if len(sys.argv) == 3 else PRECISION
+    corpus = crawl(sys.argv[1])
+    ranks, errors, samples = montecarlo_pagerank(corpus, DAMPING, precision)
+    print(f"PageRank Results from Parallel Sampling (n = {samples})")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f} ± {errors[page]:.4f}")
+
+
+def montecarlo_pagerank(corpus, damping_factor, precision=PRECISION,
+                        seed=None, processes=None):
+    """
+    Return PageRank values and their standard errors for each page,
+    sampled by independent batches of random surfers across a process
+    pool until every page's standard error is at most `precision`.
+
+    Return (ranks, errors, samples): dictionaries keyed by page name,
+    and the total number of samples drawn.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, errors, samples = parallel_sample(
+        graph, damping_factor, precision, seed=seed, processes=processes
+    )
+    return (dict(zip(graph.pages, ranks.tolist())),
+            dict(zip(graph.pages, errors.tolist())),
+            samples)
+
+
+def parallel_sample(graph, damping_factor, precision=PRECISION,
+                    batch=BATCH, max_samples=MAX_SAMPLES,
+                    seed=None, processes=None):
+    """
+    Runs batches of `batch` samples across a process pool, each with its
+    own independent random stream, in rounds of one batch per process.
+
+    Each batch gives an independent estimate of the ranks; their mean is
+    the result, and the spread between batches gives the standard error.
+    Stops after the round in which every standard error drops to
+    `precision`, or once `max_samples` have been drawn.
+
+    Returns (ranks, errors, samples) with arrays indexed by page number.
+    """
+    processes = processes or os.cpu_count()
+    seeds = np.random.SeedSequence(seed)
+    total = np.zeros(len(graph))
+    squares = np.zeros(len(graph))
+    batches = 0
+
+    with multiprocessing.Pool(processes, initializer=init_worker,
+                              initargs=(graph, damping_factor)) as pool:
+        while True:
+            work = [(child, batch) for child in seeds.spawn(processes)]
+            for counts in pool.imap_unordered(sample_batch, work):
+                estimate = counts / batch
+                total += estimate
+                squares += estimate ** 2
+                batches += 1
+
+            ranks = total / batches
+            variance = np.maximum(squares / batches - ranks ** 2, 0)
+            errors = np.sqrt(variance / max(batches - 1, 1))
+            if batches >= MIN_BATCHES and errors.max() <= precision:
+                break
+            if batches * batch >= max_samples:
+                break
+
+    return ranks, errors, batches * batch
+
+
+def init_worker(graph, damping_factor):
+    global sampler
+    sampler = SurferSampler(graph, damping_factor)
+
+
+def sample_batch(work):
+    seed, n = work
+    return sampler.walk(n, np.random.default_rng(seed))
+
+
+if __name__ == "__main__":
+    main()
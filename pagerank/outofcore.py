@@ -0,0 +1,126 @@
+import resource
+import struct
+import sys
+import time
+
+import numpy as np
+
+from pagerank import DAMPING
+from crawler import crawl_graph
+from sparse import MAX_ITERATIONS, TOLERANCE
+
+MAGIC = b"PREDGES1"
+HEADER = struct.Struct("<8sQQ")
+
+# Edges read from the file at a time
+BLOCK = 1 << 22
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python outofcore.py edges.bin [corpus]")
+    path = sys.argv[1]
+    if len(sys.argv) == 3:
+        graph, _ = crawl_graph(sys.argv[2])
+        write_edge_file(path, graph.pages, graph.sources(), graph.links)
+
+    ranks, iterations, stats = outofcore_pagerank(path, DAMPING)
+    pages = read_pages(path)
+    print(f"PageRank Results from Out-of-Core Iteration "
+          f"(converged in {iterations})")
+    for i in np.argsort(-ranks)[:10]:
+        print(f"  {pages[i]}: {ranks[i]:.4f}")
+    mean = sum(stats["iteration_seconds"]) / iterations
+    print(f"{mean * 1000:.3f} ms per iteration, "
+          f"peak RSS {stats['peak_rss_bytes'] / 1e6:.1f} MB")
+
+
+def write_edge_file(path, pages, sources, targets):
+    """
+    Writes a link graph as a binary edge file at `path`: a header with
+    the page and edge counts, then (source, target) uint32 pairs sorted
+    by source. Page names are written one per line to `path`.pages.
+    """
+    sources = np.asarray(sources, dtype=np.uint32)
+    targets = np.asarray(targets, dtype=np.uint32)
+    order = np.argsort(sources, kind="stable")
+    edges = np.empty((len(order), 2), dtype=np.uint32)
+    edges[:, 0] = sources[order]
+    edges[:, 1] = targets[order]
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(pages), len(edges)))
+        edges.tofile(f)
+    with open(f"{path}.pages", "w", encoding="utf-8") as f:
+        for page in pages:
+            f.write(f"{page}\n")
+
+
+def open_edge_file(path):
+    """
+    Memory-maps an edge file, returning (pages, edges): the page count
+    and an (edges, 2) array backed by the file rather than by memory.
+    """
+    with open(path, "rb") as f:
+        magic, pages, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("not an edge file")
+    if count == 0:
+        return pages, np.empty((0, 2), dtype=np.uint32)
+    edges = np.memmap(path, dtype=np.uint32, mode="r",
+                      offset=HEADER.size, shape=(count, 2))
+    return pages, edges
+
+
+def read_pages(path):
+    with open(f"{path}.pages", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def outofcore_pagerank(path, damping_factor, tolerance=TOLERANCE,
+                       max_iterations=MAX_ITERATIONS, block=BLOCK):
+    """
+    Computes PageRank by power iteration over a memory-mapped edge file,
+    streaming through it `block` edges at a time so that only per-page
+    vectors are held in memory.
+
+    A dangling page is treated as linking to every page. Returns
+    (ranks, iterations, stats), where stats holds the wall time of each
+    iteration and the peak resident set size of the process.
+    """
+    n, edges = open_edge_file(path)
+
+    # One streaming pass to count each page's links
+    degree = np.zeros(n, dtype=np.int64)
+    for start in range(0, len(edges), block):
+        degree += np.bincount(edges[start:start + block, 0], minlength=n)
+    dangling = degree == 0
+    inverse = np.divide(1, degree, out=np.zeros(n), where=~dangling)
+
+    ranks = np.full(n, 1 / n)
+    times = []
+    for iteration in range(1, max_iterations + 1):
+        began = time.perf_counter()
+        shares = ranks * inverse
+        new_ranks = np.zeros(n)
+        for start in range(0, len(edges), block):
+            chunk = edges[start:start + block]
+            new_ranks += np.bincount(chunk[:, 1], weights=shares[chunk[:, 0]],
+                                     minlength=n)
+        new_ranks = (
+            (1 - damping_factor) / n
+            + damping_factor * (new_ranks + ranks[dangling].sum() / n)
+        )
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        times.append(time.perf_counter() - began)
+        if change <= tolerance:
+            break
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    stats = {"iteration_seconds": times, "peak_rss_bytes": peak}
+    return ranks, iteration, stats
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ import random
 import re
 import sys
 
+from sampling import surfer_pagerank
+from sparse import sparse_pagerank
+
 DAMPING = 0.85
 SAMPLES = 10000
 
@@ -11,12 +14,13 @@ def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
     corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    ranks = surfer_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
-    print(f"PageRank Results from Iteration")
+    ranks, iterations = sparse_pagerank(corpus, DAMPING)
+    print("PageRank Results from Iteration "
+          f"(converged in {iterations} iterations)")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
 
@@ -0,0 +1,98 @@
+import multiprocessing
+import sys
+from collections import deque
+
+from pagerank import DAMPING, crawl
+
+# Residual per link below which a page's mass is no longer pushed
+EPSILON = 1e-6
+
+# Ranker shared by the worker processes of `rank_many`
+ranker = None
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus page [page ...]")
+    corpus = crawl(sys.argv[1])
+    ranks = PersonalizedRanker(corpus).rank(sys.argv[2:])
+    print(f"Personalized PageRank for {', '.join(sys.argv[2:])}")
+    for page in sorted(ranks, key=ranks.get, reverse=True):
+        print(f"  {page}: {ranks[page]:.4f}")
+
+
+class PersonalizedRanker():
+    """
+    Approximate personalized PageRank over a corpus by forward push.
+
+    A random surfer that, instead of jumping to any page, jumps back to
+    one of a set of seed pages. Mass spreads out from the seeds only
+    while it is above a threshold, so a query touches just the seeds'
+    neighbourhood rather than the whole corpus.
+    """
+
+    def __init__(self, corpus, damping_factor=DAMPING, epsilon=EPSILON):
+        self.links = {page: tuple(links) for page, links in corpus.items()}
+        self.damping_factor = damping_factor
+        self.epsilon = epsilon
+
+    def rank(self, seeds):
+        """
+        Returns a dictionary of approximate personalized PageRank values
+        for the pages reached from `seeds`, a collection of page names.
+        Pages not in the dictionary have a negligible value.
+
+        Pushing stops once every page's leftover mass is below `epsilon`
+        times its number of links, so the values sum to slightly less
+        than 1 and each falls slightly short of its exact value.
+        """
+        seeds = [seed for seed in dict.fromkeys(seeds) if seed in self.links]
+        if not seeds:
+            raise ValueError("no seed pages in the corpus")
+
+        estimate = {}
+        residual = {seed: 1 / len(seeds) for seed in seeds}
+        queue = deque(seeds)
+        queued = set(seeds)
+        while queue:
+            page = queue.popleft()
+            queued.discard(page)
+            mass = residual.pop(page, 0)
+            estimate[page] = (estimate.get(page, 0)
+                              + (1 - self.damping_factor) * mass)
+
+            # Pages without links send the surfer back to the seeds
+            targets = self.links[page] or seeds
+            share = self.damping_factor * mass / len(targets)
+            for target in targets:
+                residual[target] = residual.get(target, 0) + share
+                if (target not in queued and residual[target]
+                        >= self.epsilon * max(len(self.links[target]), 1)):
+                    queued.add(target)
+                    queue.append(target)
+        return estimate
+
+    def rank_many(self, seed_sets, processes=None):
+        """
+        Returns a list with the result of `rank` for each seed set.
+        With `processes`, the queries are spread over a process pool
+        that receives the corpus once.
+        """
+        if not processes:
+            return [self.rank(seeds) for seeds in seed_sets]
+        with multiprocessing.Pool(processes, initializer=init_worker,
+                                  initargs=(self,)) as pool:
+            return pool.map(rank_seeds, seed_sets, chunksize=16)
+
+
+def init_worker(shared):
+    global ranker
+    ranker = shared
+
+
+def rank_seeds(seeds):
+    return ranker.rank(seeds)
+
+
+if __name__ == "__main__":
+    main()
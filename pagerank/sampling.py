@@ -0,0 +1,79 @@
+import numpy as np
+
+from sparse import LinkGraph
+
+# Number of random surfers walked in parallel
+WALKERS = 65536
+
+# Steps each surfer takes before its visits are counted, and the fewest
+# counted steps per surfer, so that early visits do not bias the counts
+# towards the uniform starting pages
+BURN_IN = 50
+MIN_STEPS = 100
+
+
+class SurferSampler():
+    """
+    Random surfer over a LinkGraph. A page's links are equally likely,
+    so its next link is one uniform draw among its slots in
+    `graph.links`, and a step costs O(1) whatever the page's number of
+    links. Steps for many surfers are drawn at once with NumPy.
+    """
+
+    def __init__(self, graph, damping_factor):
+        self.graph = graph
+        self.damping_factor = damping_factor
+        self.degree = graph.out_degree()
+        self.dangling = self.degree == 0
+
+    def walk(self, n, rng, walkers=WALKERS):
+        """
+        Samples `n` pages in total from up to `walkers` independent
+        surfers, each starting on a page chosen at random. Returns the
+        number of times each page was visited, indexed by page number.
+        """
+        pages = len(self.graph)
+        counts = np.zeros(pages, dtype=np.int64)
+        walkers = max(1, min(walkers, n // MIN_STEPS))
+        position = rng.integers(0, pages, walkers)
+        for _ in range(BURN_IN):
+            position = self.step(position, rng)
+        sampled = 0
+        while sampled < n:
+            visits = position[:n - sampled]
+            counts += np.bincount(visits, minlength=pages)
+            sampled += len(visits)
+            position = self.step(position, rng)
+        return counts
+
+    def step(self, position, rng):
+        """
+        Moves every surfer in `position` one step along the transition
+        model: follow a link with probability `damping_factor`, and
+        otherwise, or on a page without links, jump to any page.
+        """
+        follow = ((rng.random(len(position)) < self.damping_factor)
+                  & ~self.dangling[position])
+        new_position = rng.integers(0, len(self.graph), len(position))
+
+        current = position[follow]
+        slot = (self.graph.offsets[current]
+                + (rng.random(len(current)) * self.degree[current])
+                .astype(np.int64))
+        new_position[follow] = self.graph.links[slot]
+        return new_position
+
+
+def surfer_pagerank(corpus, damping_factor, n, seed=None):
+    """
+    Return PageRank values for each page by sampling `n` pages
+    with many random surfers walking in parallel.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    sampler = SurferSampler(graph, damping_factor)
+    counts = sampler.walk(n, np.random.default_rng(seed))
+    return dict(zip(graph.pages, (counts / n).tolist()))
@@ -0,0 +1,142 @@
+import numpy as np
+
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 1000
+
+
+class LinkGraph():
+    """
+    Link structure of a corpus with pages interned to dense ints.
+
+    Out-links are stored as CSR arrays: the pages linked to by page `i`
+    are `links[offsets[i]:offsets[i + 1]]`, sorted and without repeats.
+    """
+
+    def __init__(self, pages, offsets, links):
+        self.pages = pages
+        self.offsets = offsets
+        self.links = links
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build a graph from a corpus dictionary as returned by `crawl`.
+        Links to pages outside the corpus and self-links are dropped.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        sources = []
+        targets = []
+        for page in pages:
+            for link in corpus[page]:
+                if link in index and link != page:
+                    sources.append(index[page])
+                    targets.append(index[link])
+        return cls.from_edges(pages, sources, targets)
+
+    @classmethod
+    def from_edges(cls, pages, sources, targets):
+        """
+        Build a graph over `pages` from parallel sequences of source
+        and target page numbers. Repeated edges and self-links are dropped.
+        """
+        n = len(pages)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        keep = sources != targets
+        edges = np.unique(sources[keep] * n + targets[keep])
+        sources, links = np.divmod(edges, n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+        return cls(list(pages), offsets, links.astype(np.int32))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def out_degree(self):
+        return np.diff(self.offsets)
+
+    def sources(self):
+        """
+        Returns the source page of every link, parallel to `links`.
+        """
+        return np.repeat(np.arange(len(self), dtype=np.int32),
+                         self.out_degree())
+
+    def to_corpus(self):
+        """
+        Returns the graph as a corpus dictionary like `crawl` returns.
+        """
+        return {
+            page: {self.pages[j]
+                   for j in self.links[self.offsets[i]:self.offsets[i + 1]]}
+            for i, page in enumerate(self.pages)
+        }
+
+
+class TransitionMatrix():
+    """
+    Column-stochastic link matrix of a graph in CSR form, with a row
+    per target page: entry (j, i) is 1 / out-degree of i if i links to j.
+    Pages without links (dangling pages) have empty columns.
+    """
+
+    def __init__(self, graph):
+        n = len(graph)
+        degree = graph.out_degree()
+        sources = graph.sources()
+
+        # Sort links by target page to lay the matrix out by row
+        order = np.argsort(graph.links, kind="stable")
+        self.indices = sources[order]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(graph.links, minlength=n), out=self.indptr[1:])
+        self.data = 1 / degree[self.indices]
+        self.rows = np.repeat(np.arange(n), np.diff(self.indptr))
+        self.dangling = degree == 0
+
+    def dot(self, ranks):
+        return np.bincount(self.rows, weights=self.data * ranks[self.indices],
+                           minlength=len(ranks))
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, ranks=None):
+    """
+    Computes PageRank over a LinkGraph by power iteration,
+    starting from `ranks` if given and from uniform ranks otherwise.
+
+    A dangling page is treated as linking to every page. Stops once the
+    L1 change between iterations is at most `tolerance`. Returns
+    (ranks, iterations) with ranks as an array indexed by page number.
+    """
+    n = len(graph)
+    matrix = TransitionMatrix(graph)
+    if ranks is None:
+        ranks = np.full(n, 1 / n)
+
+    for iteration in range(1, max_iterations + 1):
+        dangling = ranks[matrix.dangling].sum()
+        new_ranks = (
+            (1 - damping_factor) / n
+            + damping_factor * (matrix.dot(ranks) + dangling / n)
+        )
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change <= tolerance:
+            break
+    return ranks, iteration
+
+
+def sparse_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page of a corpus by sparse power
+    iteration, along with the number of iterations it took.
+
+    Return a dictionary where keys are page names, and values are
+    their estimated PageRank value (a value between 0 and 1). All
+    PageRank values should sum to 1.
+    """
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, iterations = power_iteration(graph, damping_factor, tolerance)
+    return dict(zip(graph.pages, ranks.tolist())), iterations